@@ -1,11 +1,20 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import norm
-import plotly.graph_objects as go
+import pandas as pd
+import os
 import time
-import base64
-from PIL import Image
+import uuid
+
+from derivatives import FigurePool, OrderBook, RerunProfiler, assets, calculate_option_price, monte_carlo_price, price_and_greeks, pricing_grid
+from derivatives.galton import galton_histogram, normal_approximation
+from derivatives.figures import pyplot_figure_count
+from derivatives.profiling import append_jsonl, summarize, to_jsonl
+
+# Tempos de cada estágio desta execução do script (painel de desempenho na barra lateral)
+profiler = RerunProfiler()
+
+# matplotlib e plotly são importados dentro das páginas que os usam, para que
+# cada página carregue apenas as bibliotecas de gráficos de que precisa
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title="Derivativos e Black-Scholes", layout="wide")
@@ -58,72 +67,110 @@ body {
 </style>
 """, unsafe_allow_html=True)
 
-# Função para converter imagem para base64 (opcional, se necessário)
-def get_image_base64(image_path):
-    try:
-        with open(image_path, 'rb') as f:
-            data = f.read()
-        return base64.b64encode(data).decode()
-    except FileNotFoundError:
-        return None
-
-image_base64 = get_image_base64('images/IMG_1269.jpg') 
-
-# Funções auxiliares para cálculos financeiros
-def calculate_option_price(S, K, T, r, sigma, option_type):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    if option_type == "Call":
-        price = S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-    else:
-        price = K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
-    return price
-
-def calculate_delta(S, K, T, r, sigma, option_type):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    if option_type == "Call":
-        return norm.cdf(d1)
-    else:
-        return norm.cdf(d1) - 1
-
-def calculate_gamma(S, K, T, r, sigma):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
-    return gamma
-
-def calculate_theta(S, K, T, r, sigma, option_type):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    if option_type == "Call":
-        theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T))) - r * K * np.exp(-r * T) * norm.cdf(d2)
-    else:
-        theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T))) + r * K * np.exp(-r * T) * norm.cdf(-d2)
-    return theta
-
-def calculate_vega(S, K, T, r, sigma):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    vega = S * norm.pdf(d1) * np.sqrt(T)
-    return vega / 100  # Vega é geralmente expresso por mudança de 1% na volatilidade
-
-def calculate_rho(S, K, T, r, sigma, option_type):
-    d2 = (np.log(S / K) + (r - 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    if option_type == "Call":
-        rho = K * T * np.exp(-r * T) * norm.cdf(d2)
-    else:
-        rho = -K * T * np.exp(-r * T) * norm.cdf(-d2)
-    return rho / 100  # Rho é geralmente expresso por mudança de 1% na taxa de juros
+profiler.mark("setup")
 
 # Função para criar gráficos responsivos
+# Figuras matplotlib reaproveitadas por sessão (fora do registro global do pyplot,
+# que crescia a cada rerun porque as figuras nunca eram fechadas)
+def session_figure(name):
+    return st.session_state.setdefault('figure_pool', FigurePool()).get(name)
+
 def create_responsive_plot(fig_func, **kwargs):
-    fig, ax = plt.subplots()
+    fig, ax = session_figure(fig_func.__name__)
     fig_func(ax, **kwargs)
+    profiler.mark("plot")
     st.pyplot(fig, use_container_width=True)
+    profiler.mark("rasterize")
+
+# Simulações em tempo real sem prender a thread da sessão: o estado de cada execução
+# fica em st.session_state e um fragmento com run_every avança um quadro por tique.
+# Entre os tiques nenhuma thread do servidor fica dormindo; parâmetros alterados no
+# meio da execução valem a partir do quadro seguinte, e a execução pode ser parada,
+# retomada ou reiniciada.
+def simulation_run(key):
+    return st.session_state.setdefault(key, {"running": False, "step": 0, "history": {}, "engine": None})
+
+def start_simulation(key, reset):
+    run = simulation_run(key)
+    run.update(running=True, step=0, history={}, engine=reset())
+
+def toggle_simulation(key):
+    run = simulation_run(key)
+    run["running"] = not run["running"] and run["engine"] is not None
+
+# Botões de controle; os callbacks mudam o estado antes do rerun, então o fragmento
+# já é definido com (ou sem) o tique da execução
+def simulation_controls(key, reset):
+    run = simulation_run(key)
+    col1, col2, col3 = st.columns(3)
+    col1.button("Iniciar Simulação", key=f"{key}_iniciar", on_click=start_simulation, args=(key, reset),
+                disabled=run["running"])
+    col2.button("Parar" if run["running"] else "Continuar", key=f"{key}_parar", on_click=toggle_simulation, args=(key,),
+                disabled=run["engine"] is None)
+    col3.button("Reiniciar", key=f"{key}_reiniciar", on_click=start_simulation, args=(key, reset),
+                disabled=run["engine"] is None)
+    return run
+
+# Passos simulados por quadro para percorrer n_steps em `duration` segundos a `fps` quadros/s
+def steps_per_frame(n_steps, fps, duration):
+    return max(1, -(-n_steps // max(1, int(fps * duration))))
+
+# Acrescenta as séries de um quadro ao histórico da execução. Cada série é um buffer
+# que dobra de capacidade quando enche, guardado com o número de posições usadas:
+# o custo por quadro é o do próprio quadro, não o da trajetória inteira
+def append_history(run, **series):
+    for name, values in series.items():
+        values = np.asarray(values)
+        buffer, size = run["history"].get(name, (np.empty(0, dtype=values.dtype), 0))
+        if size + len(values) > len(buffer):
+            grown = np.empty(max(2 * len(buffer), size + len(values), 1024), dtype=buffer.dtype)
+            grown[:size] = buffer[:size]
+            buffer = grown
+        buffer[size:size + len(values)] = values
+        run["history"][name] = (buffer, size + len(values))
+
+# Histórico acumulado como DataFrame, reduzido a no máximo max_points linhas para o
+# gráfico: o tamanho enviado a cada quadro não cresce com a trajetória
+def history_frame(run, columns, max_points=2000):
+    if not run["history"]:
+        return pd.DataFrame(columns=list(columns.values()))
+    data = {}
+    for name, label in columns.items():
+        buffer, size = run["history"][name]
+        data[label] = buffer[:size]
+    n = len(next(iter(data.values())))
+    rows = np.unique(np.linspace(0, n - 1, min(n, max_points)).astype(int))
+    return pd.DataFrame({label: values[rows] for label, values in data.items()}, index=pd.Index(rows, name="Tempo"))
+
+# Controles de tamanho e ritmo das simulações em tempo real
+def animation_controls():
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_steps = st.select_slider("Passos da Simulação", [200, 1_000, 10_000, 100_000], 200)
+    with col2:
+        fps = st.slider("Quadros por Segundo", 1, 60, 10)
+    with col3:
+        duration = st.slider("Duração da Animação (s)", 1, 60, 20)
+    return n_steps, fps, duration
+
+# Guarda a medição de uma execução (da página ou de um quadro de fragmento) no
+# histórico da sessão e, se configurado, no log JSON lines do processo
+def record_profile(profile):
+    profile_history = st.session_state.setdefault('profile_history', [])
+    profile_history.append(profile)
+    del profile_history[:-500]
+    if os.environ.get("DERIVATIVES_PROFILE_LOG"):
+        append_jsonl(os.environ["DERIVATIVES_PROFILE_LOG"], [profile])
 
 # Navegação principal
 st.sidebar.title("Navegação")
 page = st.sidebar.radio("Escolha uma seção",
     ["Introdução", "Conceitos Básicos", "Compradores vs. Vendedores", "Galton Board", 
      "Movimento Browniano", "Opções", "Black-Scholes", "Gregas", "Simulador Avançado",])
+show_profiler = st.sidebar.checkbox("Painel de Desempenho (debug)")
+profiler.page = page
+profiler.session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+profiler.mark("navigation")
 
 # Seção: Introdução
 if page == "Introdução":
@@ -151,7 +198,7 @@ if page == "Introdução":
 
     st.subheader("Limitações e Evoluções")
     st.write("""
-    Apesar de seu impacto profundo, a equação de Black-Scholes não está isenta de limitações. Suas suposições, como a constante volatilidade dos ativos e a ausência de custos de transação, nem sempre refletem a realidade dos mercados financeiros. No entanto, essas limitações incentivaram o desenvolvimento de modelos financeiros mais sofisticados e a contínua evolução das teorias de precificação de opções.
+    Apesar de seu impacto profundo, a equação de Black-Scholes não está isenta de limitações. Suas suposições, como a constante volatilidade dos ativos e a ausência de custos de transação, nem sempre refletem a realidade dos mercados financeiros. No entanto, essas limitações incentivaram o desenvolvimento de modelos financeiros mais sofisticados e a contínua evolução das teorias de precificação de opções, como o modelo de **Heston**, em que a própria volatilidade é aleatória, e o de **Merton**, em que o preço pode dar saltos. Na seção **Black-Scholes** você pode comparar os preços desses modelos com os de Black-Scholes.
     """)
 
     st.subheader("Objetivos deste Site")
@@ -169,6 +216,7 @@ if page == "Introdução":
 
     # Adicionar uma separação visual
     st.markdown('---')
+    profiler.mark("content")
 
     # Layout em colunas para imagem e texto, centralizado
     col_left, col_center, col_right = st.columns([1, 2, 1])  # Proporção 1:2:1
@@ -178,9 +226,10 @@ if page == "Introdução":
 
         with col1:
             try:
-                # Carregar e exibir a imagem
-                image = Image.open('images/IMG_1269.jpg')  # Atualize o caminho conforme necessário
+                # Imagem lida uma vez por processo e compartilhada entre as sessões
+                image = assets.get('images/IMG_1269.jpg')  # Atualize o caminho conforme necessário
                 st.image(image, caption='Étore Braga e Santos', use_column_width=True)
+                profiler.mark("image")
             except FileNotFoundError:
                 st.error("Imagem não encontrada. Verifique o caminho e o nome do arquivo.")
 
@@ -216,15 +265,18 @@ elif page == "Conceitos Básicos":
     A **distribuição normal**, também conhecida como distribuição gaussiana, é fundamental para a modelagem de riscos financeiros. Ela descreve como os valores de uma variável se distribuem em torno de uma média, com uma determinada dispersão.
     """)
 
+    profiler.mark("content")
+
     col1, col2 = st.columns(2)
     with col1:
         mu = st.slider("Média (μ)", -5.0, 5.0, 0.0, step=0.1)
     with col2:
         sigma = st.slider("Desvio Padrão (σ)", 0.1, 3.0, 1.0, step=0.1)
+    profiler.mark("widgets")
 
     def plot_normal_dist(ax, mu, sigma):
         x = np.linspace(-10, 10, 1000)
-        y = norm.pdf(x, mu, sigma)
+        y = np.exp(-0.5 * ((x - mu) / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
         ax.plot(x, y)
         ax.set_title("Distribuição Normal")
         ax.set_xlabel("Valor")
@@ -252,7 +304,7 @@ elif page == "Conceitos Básicos":
 
 # Seção: Galton Board
 elif page == "Galton Board":
-    st.title("Animação do Galton Board")
+    st.title("Simulação do Galton Board")
 
     st.write("""
     O **Galton Board** é uma ferramenta visual que demonstra como uma distribuição normal emerge a partir de eventos aleatórios binários. Este experimento ilustra o conceito de probabilidade e como pequenas variações individuais podem levar a um padrão previsível em grande escala.
@@ -269,16 +321,46 @@ elif page == "Galton Board":
     O Galton Board ajuda a entender como a variabilidade nos preços dos ativos pode se somar para formar uma distribuição normal, base para a precificação de derivativos e análise de riscos.
     """)
 
-    st.subheader("Animação Interativa")
-    st.write("Observe a animação abaixo para visualizar como a distribuição normal se forma conforme as bolas passam pelos níveis do Galton Board.")
+    st.subheader("Simulação Interativa")
+    st.write("Escolha o número de níveis e de bolas e observe como o histograma das posições finais se aproxima da curva normal conforme as bolas caem.")
+    profiler.mark("content")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        n_niveis = st.slider("Número de Níveis", 1, 50, 12)
+    with col2:
+        n_bolas = st.select_slider("Número de Bolas", [100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000], 100_000)
+    run_simulation = st.button("Soltar Bolas")
+    mostrar_video = st.checkbox("Mostrar vídeo de um Galton Board real")
+    profiler.mark("widgets")
+
+    galton_chart = st.empty()
 
-    # Exibir o vídeo da animação
-    try:
-        video_file = open('videos/galton_board.mp4', 'rb')
-        video_bytes = video_file.read()
-        st.video(video_bytes)
-    except FileNotFoundError:
-        st.error("Arquivo de vídeo 'galton_board.mp4' não encontrado. Por favor, verifique o caminho e tente novamente.")
+    if run_simulation:
+        import plotly.graph_objects as go
+
+        # Bolas simuladas em lotes vetorizados; o gráfico só recebe o histograma
+        # (n_niveis + 1 barras), então cada atualização tem tamanho constante
+        posicoes = np.arange(n_niveis + 1)
+        x_normal = np.linspace(-0.5, n_niveis + 0.5, 200)
+        for contagens, bolas in galton_histogram(n_niveis, n_bolas, batch_size=max(n_bolas // 20, 1)):
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=posicoes, y=contagens, name='Bolas'))
+            fig.add_trace(go.Scatter(x=x_normal, y=normal_approximation(n_niveis, bolas, x_normal), mode='lines', name='Aproximação Normal'))
+            fig.update_layout(title=f'Galton Board: {bolas:,} bolas em {n_niveis} níveis', xaxis_title='Compartimento', yaxis_title='Número de Bolas')
+            galton_chart.plotly_chart(fig, use_container_width=True)
+            time.sleep(0.05)
+        profiler.mark("simulation")
+
+    if mostrar_video:
+        # Os bytes vêm do cache do processo; o Streamlit guarda uma única cópia por
+        # conteúdo e a serve com suporte a requisições de intervalo (Range)
+        try:
+            video_bytes = assets.get('videos/galton_board.mp4')
+            st.video(video_bytes)
+            profiler.mark("video")
+        except FileNotFoundError:
+            st.error("Arquivo de vídeo 'galton_board.mp4' não encontrado. Por favor, verifique o caminho e tente novamente.")
 
 # Seção: Movimento Browniano
 elif page == "Movimento Browniano":
@@ -304,39 +386,54 @@ elif page == "Movimento Browniano":
     Abaixo, você pode iniciar uma simulação em tempo real do Movimento Browniano, ajustando a volatilidade e observando como o preço do ativo evolui ao longo do tempo.
     """)
 
+    profiler.mark("content")
+
     volatilidade = st.slider("Volatilidade (σ): Controle o nível de variação do preço do ativo.", 0.1, 0.5, 0.2, 0.01)
     preco_inicial = st.number_input("Preço Inicial: Defina o ponto de partida para a simulação.", 50.0, 150.0, 100.0, 1.0)
 
-    # Espaço para o gráfico
-    brownian_chart = st.empty()
-
-    # Parâmetros iniciais
-    precos = [preco_inicial]
-    t = [0]
-
-    run_simulation = st.button("Iniciar Simulação")
-
-    if run_simulation:
-        for i in range(1, 200):
-            delta_t = 1
-            delta_preco = np.random.normal(0, volatilidade * np.sqrt(delta_t))
-            novo_preco = precos[-1] + delta_preco
-            precos.append(novo_preco)
-            t.append(i)
-
-            # Criação do gráfico
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=t, y=precos, mode='lines', name='Preço'))
-            fig.update_layout(title='Movimento Browniano do Preço do Ativo', xaxis_title='Tempo', yaxis_title='Preço')
-
-            brownian_chart.plotly_chart(fig, use_container_width=True)
-
-            time.sleep(0.1)
-
-        st.success("Simulação concluída.")
+    n_passos, fps, duracao = animation_controls()
+
+    # O motor guarda o gerador e o último preço; mudar a volatilidade no meio da
+    # execução altera apenas os passos seguintes
+    run = simulation_controls("browniano", lambda: {"rng": np.random.default_rng(), "preco": preco_inicial})
+    profiler.mark("widgets")
+
+    @st.fragment(run_every=1 / fps if run["running"] else None)
+    def quadro_browniano():
+        # Cada quadro é uma execução própria do fragmento, medida à parte do profiler da página
+        quadro = RerunProfiler(f"{page}/frame", st.session_state['session_id'])
+        run = simulation_run("browniano")
+        # Com menos passos escolhidos no meio da execução, ela já pode ter terminado
+        if run["running"] and run["step"] >= n_passos:
+            run["running"] = False
+            st.rerun()
+        if run["running"]:
+            motor = run["engine"]
+            n = max(0, min(steps_per_frame(n_passos, fps, duracao), n_passos - run["step"]))
+            precos = motor["preco"] + np.cumsum(motor["rng"].normal(0, volatilidade, n))
+            motor["preco"] = precos[-1]
+            append_history(run, preco=precos)
+            run["step"] += n
+            quadro.mark("simulation")
+
+        st.caption("Movimento Browniano do Preço do Ativo")
+        st.line_chart(history_frame(run, {"preco": "Preço"}))
+        st.progress(min(1.0, run["step"] / n_passos), text=f"Passo {run['step']:,} de {n_passos:,}")
+        quadro.mark("plot")
+        if run["running"] and run["step"] >= n_passos:
+            run["running"] = False
+            st.rerun()
+        elif not run["running"] and run["step"] >= n_passos:
+            st.success("Simulação concluída.")
+        record_profile(quadro.finish())
+
+    quadro_browniano()
+    profiler.mark("simulation")
 
 # Seção: Opções
 elif page == "Opções":
+    import plotly.graph_objects as go
+
     st.title("Entendendo Opções")
 
     st.write("""
@@ -354,10 +451,13 @@ elif page == "Opções":
     Abaixo, você pode visualizar o lucro ou prejuízo de uma opção conforme o preço do ativo no vencimento. Ajuste os parâmetros para entender como diferentes fatores influenciam o desempenho da opção.
     """)
 
+    profiler.mark("content")
+
     option_type = st.selectbox("Tipo de Opção", ["Call", "Put"])
     S = st.slider("Preço Atual do Ativo (S)", 0.0, 200.0, 100.0, 1.0)
     K = st.slider("Preço de Exercício (K)", 0.0, 200.0, 100.0, 1.0)
     premium = st.number_input("Prêmio da Opção", 0.0, 50.0, 10.0, 0.5)
+    profiler.mark("widgets")
 
     # Função de payoff
     def option_payoff(S_range, K, premium, option_type):
@@ -370,6 +470,7 @@ elif page == "Opções":
     # Range de preços no vencimento
     S_range = np.linspace(0, 2*K, 1000)
     payoff = option_payoff(S_range, K, premium, option_type)
+    profiler.mark("pricing")
 
     # Criar o gráfico
     fig = go.Figure()
@@ -409,11 +510,74 @@ elif page == "Opções":
     )
 
     fig.update_layout(title='Lucro/Prejuízo da Opção', xaxis_title='Preço do Ativo no Vencimento', yaxis_title='Lucro/Prejuízo')
+    profiler.mark("plot")
     st.plotly_chart(fig, use_container_width=True)
+    profiler.mark("plotly")
     st.caption("Gráfico mostrando o lucro ou prejuízo de uma opção conforme o preço do ativo no vencimento.")
 
+    # Estratégias com várias pernas, montadas em torno do strike escolhido acima
+    st.header("Estratégias com Múltiplas Pernas")
+    st.write("""
+    Combinando compras e vendas de Calls e Puts com strikes diferentes, é possível montar estratégias com perfis de risco bem definidos: **travas** apostam em uma direção com ganho e perda limitados, **straddles** e **strangles** apostam em movimentos fortes, e **borboletas** e **condors** apostam que o preço ficará parado. Os prêmios de cada perna são calculados por Black-Scholes.
+    """)
+    from derivatives import PRESETS
+
+    scol1, scol2 = st.columns(2)
+    with scol1:
+        preset = st.selectbox("Estratégia", list(PRESETS))
+        width = st.slider("Distância entre Strikes", 1.0, 50.0, 10.0, 1.0, key="strategy_width")
+    with scol2:
+        strategy_T = st.slider("Tempo até Vencimento (anos)", 0.05, 2.0, 0.5, 0.05)
+        strategy_sigma = st.slider("Volatilidade (σ)", 0.05, 0.8, 0.2, 0.01)
+    strategy_r = 0.05
+    profiler.mark("widgets")
+
+    # O menor strike do preset é K - distância (K - 2 * distância no condor de ferro) e
+    # precisa ficar positivo, assim como S, para que preço e Gregas existam. A distância
+    # escolhida é limitada aqui, sem mudar o controle, que mantém o valor quando K volta a subir.
+    reach = 2 if preset == "Condor de Ferro" else 1
+    max_width = np.ceil(K / reach) - 1
+    if S <= 0 or max_width < 1:
+        st.info("As estratégias precisam de S e de strikes positivos: aumente S ou o preço de exercício K.")
+    else:
+        if width > max_width:
+            st.caption(f"Distância limitada a {max_width:.0f} para manter todos os strikes positivos.")
+            width = float(max_width)
+        strategy = PRESETS[preset](K, width, strategy_T).mark_premiums(S, strategy_r, strategy_sigma)
+        strategy_profit = strategy.profit(S_range)
+        net = strategy.price_and_greeks(S, strategy_r, strategy_sigma)
+        profiler.mark("pricing")
+
+        legs = pd.DataFrame({
+            "Posição": np.where(strategy.quantity > 0, "Comprada", "Vendida"),
+            "Tipo": strategy.option_types(),
+            "Strike": strategy.strike,
+            "Quantidade": np.abs(strategy.quantity),
+            "Prêmio": strategy.premium.round(2),
+        })
+        st.dataframe(legs, hide_index=True)
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=S_range, y=np.where(strategy_profit >= 0, strategy_profit, np.nan), mode='lines',
+                                 name='Lucro', fill='tozeroy', fillcolor='rgba(0, 255, 0, 0.3)'))
+        fig.add_trace(go.Scatter(x=S_range, y=np.where(strategy_profit < 0, strategy_profit, np.nan), mode='lines',
+                                 name='Prejuízo', fill='tozeroy', fillcolor='rgba(255, 0, 0, 0.3)'))
+        fig.add_vline(x=S, line=dict(color="gray", dash="dash"))
+        fig.update_layout(title=f'Lucro/Prejuízo: {preset}', xaxis_title='Preço do Ativo no Vencimento', yaxis_title='Lucro/Prejuízo')
+        profiler.mark("plot")
+        st.plotly_chart(fig, use_container_width=True)
+        profiler.mark("plotly")
+
+        metric_cols = st.columns(6)
+        metric_cols[0].metric("Custo Líquido", f"{strategy.cost():.2f}")
+        for col, greek in zip(metric_cols[1:], ["Delta", "Gamma", "Theta", "Vega", "Rho"]):
+            col.metric(f"{greek} Líquido", f"{net[greek.lower()]:.4f}")
+        st.caption("Custo positivo indica estratégia paga (débito); negativo, estratégia que recebe prêmio (crédito).")
+
 # Seção: Black-Scholes
 elif page == "Black-Scholes":
+    import plotly.graph_objects as go
+
     st.title("Visualização Interativa da Fórmula de Black-Scholes")
 
     st.write("""
@@ -455,6 +619,7 @@ elif page == "Black-Scholes":
     """)
 
     st.subheader("Cálculos Intermediários")
+    profiler.mark("content")
 
     # Parâmetros
     col1, col2 = st.columns(2)
@@ -466,11 +631,13 @@ elif page == "Black-Scholes":
         r = st.number_input("Taxa de Juros Livre de Risco (r)", 0.0, 0.1, 0.05, 0.01)
         sigma = st.number_input("Volatilidade (σ)", 0.01, 0.5, 0.2, 0.01)
         option_type = st.selectbox("Tipo de Opção", ["Call", "Put"])
+    profiler.mark("widgets")
 
     # Cálculo dos parâmetros d1 e d2
     d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
     d2 = d1 - sigma * np.sqrt(T)
     price = calculate_option_price(S, K, T, r, sigma, option_type)
+    profiler.mark("pricing")
 
     st.latex(r"""
     \begin{aligned}
@@ -509,6 +676,173 @@ elif page == "Black-Scholes":
 
     st.metric("Preço da Opção", f"{price:.2f}")
 
+    st.subheader("Verificação por Monte Carlo")
+    st.write("""
+    O mesmo preço pode ser estimado simulando muitas trajetórias do ativo e calculando a média do payoff descontado. Com mais trajetórias, a estimativa converge para o valor da fórmula fechada.
+    """)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        n_paths = st.select_slider("Número de Trajetórias", [10_000, 100_000, 1_000_000, 10_000_000], 1_000_000)
+    with col2:
+        antithetic = st.checkbox("Variáveis Antitéticas")
+        control_variate = st.checkbox("Variável de Controle")
+    profiler.mark("content")
+    run_monte_carlo = st.button("Simular Monte Carlo")
+    profiler.mark("widgets")
+
+    if run_monte_carlo:
+        mc = monte_carlo_price(S, K, T, r, sigma, option_type, n_paths=n_paths,
+                               antithetic=antithetic, control_variate=control_variate)
+        profiler.mark("pricing")
+        st.metric("Preço por Monte Carlo", f"{mc['price']:.4f}", f"{mc['price'] - price:+.4f} vs. fórmula")
+        st.caption(f"Erro padrão: {mc['stderr']:.4f}")
+
+        trace_paths, trace_price, trace_stderr = mc["trace"].T
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=trace_paths, y=trace_price + 2 * trace_stderr, mode='lines', line=dict(width=0), showlegend=False))
+        fig.add_trace(go.Scatter(x=trace_paths, y=trace_price - 2 * trace_stderr, mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(0, 82, 204, 0.2)', name='±2 Erros Padrão'))
+        fig.add_trace(go.Scatter(x=trace_paths, y=trace_price, mode='lines', name='Monte Carlo'))
+        fig.add_hline(y=price, line=dict(color="gray", dash="dash"), annotation_text="Black-Scholes")
+        fig.update_layout(title='Convergência do Preço por Monte Carlo', xaxis_title='Trajetórias Simuladas', yaxis_title='Preço da Opção')
+        profiler.mark("plot")
+        st.plotly_chart(fig, use_container_width=True)
+        profiler.mark("plotly")
+
+    st.subheader("Árvore Binomial e Exercício Antecipado")
+    st.write("""
+    A ideia do **Galton Board** também precifica opções: em cada passo o ativo sobe ou desce, como a bola que bate em um pino. A **árvore binomial de Cox-Ross-Rubinstein** calcula o payoff nas pontas da árvore e volta passo a passo descontando a média ponderada dos dois ramos. Com mais passos, o preço europeu converge para o de Black-Scholes. Como a árvore passa por todos os nós intermediários, ela também precifica **opções americanas**, que podem ser exercidas antes do vencimento: em cada nó vale o maior entre continuar e exercer.
+    """)
+    tree_method = st.radio("Árvore", ["Binomial (CRR)", "Trinomial"], horizontal=True)
+    profiler.mark("widgets")
+
+    from derivatives.trees import tree_convergence_table
+
+    # Em cache compartilhado entre sessões: mudar outro controle da página não refaz as árvores
+    convergence = pd.DataFrame(tree_convergence_table(S, K, T, r, sigma, option_type,
+                                                      method="crr" if tree_method == "Binomial (CRR)" else "trinomial"))
+    profiler.mark("pricing")
+    col1, col2 = st.columns(2)
+    col1.metric(f"Europeia ({convergence['steps'].iloc[-1]} passos)", f"{convergence['european'].iloc[-1]:.4f}",
+                f"{convergence['error'].iloc[-1]:+.4f} vs. fórmula")
+    col2.metric(f"Americana ({convergence['steps'].iloc[-1]} passos)", f"{convergence['american'].iloc[-1]:.4f}",
+                f"{convergence['american'].iloc[-1] - convergence['european'].iloc[-1]:+.4f} de prêmio pelo exercício antecipado")
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=convergence["steps"], y=convergence["european"], mode='lines+markers', name='Europeia'))
+    fig.add_trace(go.Scatter(x=convergence["steps"], y=convergence["american"], mode='lines+markers', name='Americana'))
+    fig.add_hline(y=price, line=dict(color="gray", dash="dash"), annotation_text="Black-Scholes")
+    fig.update_layout(title='Convergência da Árvore', xaxis_title='Passos', xaxis_type='log', yaxis_title='Preço da Opção')
+    profiler.mark("plot")
+    st.plotly_chart(fig, use_container_width=True)
+    profiler.mark("plotly")
+    st.dataframe(convergence.rename(columns={
+        "steps": "Passos", "european": "Europeia", "american": "Americana", "black_scholes": "Black-Scholes",
+        "error": "Erro (Europeia)", "seconds": "Tempo (s)",
+    }), hide_index=True)
+
+    st.subheader("Resolvendo a Equação Diferencial")
+    st.write("""
+    A fórmula de Black-Scholes é a solução de uma **equação diferencial parcial**. Em vez de usar a fórmula, podemos resolver a equação numericamente em uma grade de preços do ativo e tempos, partindo do payoff no vencimento e voltando até hoje. O método de **diferenças finitas** funciona também quando não existe fórmula fechada, como em **opções americanas** ou com **barreiras** que extinguem a opção.
+    """)
+    st.latex(r"""
+    \frac{\partial V}{\partial t} + \frac{1}{2}\sigma^2 S^2 \frac{\partial^2 V}{\partial S^2} + r S \frac{\partial V}{\partial S} - r V = 0
+    """)
+    col1, col2 = st.columns(2)
+    with col1:
+        fd_scheme = st.selectbox("Esquema", ["Crank-Nicolson", "Implícito", "Explícito"])
+        fd_american = st.checkbox("Opção Americana")
+    with col2:
+        fd_barrier_type = st.selectbox("Barreira", ["Nenhuma", "Knock-out Acima (up-and-out)", "Knock-out Abaixo (down-and-out)"])
+        fd_barrier = None
+        if fd_barrier_type == "Knock-out Acima (up-and-out)":
+            fd_barrier = st.number_input("Nível da Barreira", S + 1.0, 4 * S, 1.3 * S, 1.0)
+        elif fd_barrier_type == "Knock-out Abaixo (down-and-out)":
+            fd_barrier = st.number_input("Nível da Barreira", 0.25 * S, S - 1.0, 0.8 * S, 1.0)
+    profiler.mark("widgets")
+
+    from derivatives.pde import fd_price_summary
+
+    scheme = {"Crank-Nicolson": "crank-nicolson", "Implícito": "implicit", "Explícito": "explicit"}[fd_scheme]
+    # Sem n_time, o explícito usa o menor número de passos estável (bem mais que 200).
+    # Em cache compartilhado entre sessões, com a grade já reduzida a 100 pontos por eixo.
+    fd = fd_price_summary(S, K, T, r, sigma, option_type, scheme, n_space=200, american=fd_american,
+                          barrier=fd_barrier, barrier_type="up-and-out" if "Acima" in fd_barrier_type else "down-and-out")
+    profiler.mark("pricing")
+
+    exact = fd_barrier is None and not fd_american
+    col1, col2, col3 = st.columns(3)
+    closed_form = price_and_greeks(S, K, T, r, sigma, option_type)
+    for col, name, label in ((col1, "price", "Preço"), (col2, "delta", "Delta"), (col3, "gamma", "Gamma")):
+        col.metric(f"{label} (Diferenças Finitas)", f"{fd[name]:.4f}",
+                   f"{fd[name] - closed_form[name]:+.5f} vs. fórmula" if exact else None)
+    if not exact:
+        st.caption("Com exercício antecipado ou barreira não há fórmula fechada de Black-Scholes para comparar.")
+
+    fig = go.Figure(go.Heatmap(x=fd["S_grid"], y=fd["t_grid"], z=fd["values"], colorscale="Viridis", colorbar=dict(title="Valor")))
+    fig.add_vline(x=S, line=dict(color="white", dash="dash"))
+    fig.update_layout(title='Valor da Opção na Grade (S, t)', xaxis_title='Preço do Ativo', yaxis_title='Tempo (anos)', height=500)
+    profiler.mark("plot")
+    st.plotly_chart(fig, use_container_width=True)
+    profiler.mark("plotly")
+    st.caption(f"Grade de 200 pontos de preço por {fd['n_time']} passos de tempo; Delta e Gamma são lidos da própria grade, sem reprecificar.")
+
+    st.subheader("Além da Volatilidade Constante: Heston e Merton")
+    st.write("""
+    Black-Scholes supõe volatilidade constante e preços sem saltos. Com essa suposição, a **volatilidade implícita** seria a mesma para todos os strikes, mas nos mercados reais ela forma um "sorriso" ou uma inclinação (*skew*). No modelo de **Heston** a variância é aleatória e correlacionada com o preço; no de **Merton** o preço também dá saltos. Nenhum dos dois tem uma fórmula simples como a de Black-Scholes, mas ambos têm **função característica** conhecida, e com ela a transformada rápida de Fourier (**FFT**, método de Carr-Madan) precifica centenas de strikes de uma só vez.
+    """)
+    col1, col2 = st.columns(2)
+    with col1:
+        heston_rho = st.slider("Correlação Preço-Volatilidade (ρ, Heston)", -0.95, 0.95, -0.7, 0.05)
+        heston_xi = st.slider("Volatilidade da Volatilidade (ξ, Heston)", 0.05, 1.0, 0.5, 0.05)
+    with col2:
+        merton_lam = st.slider("Saltos por Ano (λ, Merton)", 0.0, 3.0, 0.5, 0.1)
+        merton_mu = st.slider("Tamanho Médio do Salto (μ, Merton)", -0.3, 0.3, -0.1, 0.01)
+    profiler.mark("widgets")
+
+    from derivatives import fft_price, implied_volatility
+    from derivatives.fourier import fft_convergence_table
+
+    # Mesma variância de partida nos três modelos, para que as diferenças venham só
+    # da volatilidade aleatória e dos saltos
+    models = {
+        "Black-Scholes": ("black-scholes", {"sigma": sigma}),
+        "Heston": ("heston", {"v0": sigma**2, "theta": sigma**2, "xi": heston_xi, "rho": heston_rho}),
+        "Merton": ("merton", {"sigma": sigma, "lam": merton_lam, "mu_j": merton_mu, "delta_j": 0.15}),
+    }
+    smile_strikes = np.linspace(0.6 * S, 1.4 * S, 200)
+    smiles = {}
+    fig = go.Figure()
+    for name, (model, params) in models.items():
+        fft_start = time.perf_counter()
+        calls = fft_price(S, T, r, model, params, smile_strikes)["price"]
+        smiles[name] = time.perf_counter() - fft_start
+        vols = implied_volatility(calls, S, smile_strikes, T, r)["iv"]
+        fig.add_trace(go.Scatter(x=smile_strikes, y=vols, mode='lines', name=name))
+    fig.add_vline(x=S, line=dict(color="gray", dash="dash"))
+    fig.update_layout(title='Volatilidade Implícita por Strike', xaxis_title='Preço de Exercício', yaxis_title='Volatilidade Implícita')
+    profiler.mark("pricing")
+    st.plotly_chart(fig, use_container_width=True)
+    profiler.mark("plotly")
+
+    cols = st.columns(3)
+    for col, (name, (model, params)) in zip(cols, models.items()):
+        model_price = fft_price(S, T, r, model, params, [K], option_type)["price"][0]
+        col.metric(f"{option_type} em K = {K:.0f} ({name})", f"{model_price:.4f}",
+                   f"{model_price - price:+.4f} vs. Black-Scholes" if name != "Black-Scholes" else None)
+        col.caption(f"200 strikes em {smiles[name] * 1000:.1f} ms")
+
+    # A referência do Heston é uma quadratura adaptativa: a tabela fica em cache
+    # compartilhado entre sessões, chaveada pelos parâmetros de cada modelo
+    convergence = pd.DataFrame([{**row, "model": name} for name, (model, params) in models.items()
+                                for row in fft_convergence_table(S, T, r, model, tuple(params.items()), sizes=(1024, 4096))])
+    profiler.mark("pricing")
+    st.dataframe(convergence.rename(columns={
+        "model": "Modelo", "n": "Pontos da FFT", "strikes": "Strikes", "max_error": "Erro Máximo",
+        "milliseconds": "FFT (ms)", "reference_milliseconds": "Referência (ms)",
+    }), hide_index=True)
+    st.caption("Referência sem FFT: fórmula fechada (Black-Scholes), série de Merton e integração numérica (Heston).")
+
 # Seção: Gregas
 elif page == "Gregas":
     st.title("Visualização das Gregas")
@@ -525,6 +859,7 @@ elif page == "Gregas":
     - **Vega (ν):** Sensibilidade do preço da opção em relação à volatilidade do ativo.
     - **Rho (ρ):** Sensibilidade do preço da opção em relação à taxa de juros livre de risco.
     """)
+    profiler.mark("content")
 
     # Parâmetros
     col1, col2 = st.columns(2)
@@ -536,25 +871,19 @@ elif page == "Gregas":
         r = st.number_input("Taxa de Juros Livre de Risco (r)", 0.0, 0.1, 0.05, 0.01)
         sigma = st.number_input("Volatilidade (σ)", 0.01, 0.5, 0.2, 0.01)
         option_type = st.selectbox("Tipo de Opção", ["Call", "Put"])
+    # Com a superfície, a vol de cada contrato é lida em (K, T) no sorriso de Heston
+    # com variância inicial e de longo prazo σ²
+    vol_source = st.radio("Volatilidade", ["Constante (σ)", "Superfície (sorriso de Heston)"], horizontal=True)
 
     # Seleção de uma única Grega
     greek = st.selectbox("Selecione a Grega para visualizar", ["Delta", "Gamma", "Theta", "Vega", "Rho"])
+    # float32 usa metade da memória nas curvas e superfícies; a perda de precisão é medida abaixo
+    precision = st.radio("Precisão Numérica", ["float64", "float32 (compacta)"], horizontal=True)
+    dtype = "float32" if precision.startswith("float32") else "float64"
+    profiler.mark("widgets")
 
     # Função para plotar a Grega selecionada
-    def plot_single_greek(ax, S_range, K, T, r, sigma, option_type, greek):
-        values = []
-        for S_val in S_range:
-            if greek == "Delta":
-                value = calculate_delta(S_val, K, T, r, sigma, option_type)
-            elif greek == "Gamma":
-                value = calculate_gamma(S_val, K, T, r, sigma)
-            elif greek == "Theta":
-                value = calculate_theta(S_val, K, T, r, sigma, option_type)
-            elif greek == "Vega":
-                value = calculate_vega(S_val, K, T, r, sigma)
-            elif greek == "Rho":
-                value = calculate_rho(S_val, K, T, r, sigma, option_type)
-            values.append(value)
+    def plot_single_greek(ax, S_range, values, greek):
         ax.plot(S_range, values, label=greek)
         ax.set_title(f"{greek} vs. Preço do Ativo")
         ax.set_xlabel("Preço do Ativo")
@@ -562,9 +891,89 @@ elif page == "Gregas":
         ax.legend()
         ax.grid(True)
 
-    S_range = np.linspace(0.5*K, 1.5*K, 100)
-    create_responsive_plot(plot_single_greek, S_range=S_range, K=K, T=T, r=r, sigma=sigma, option_type=option_type, greek=greek)
+    if vol_source == "Constante (σ)":
+        vol = sigma
+    else:
+        from derivatives.vol_surface import model_surface
+
+        # Ajustada uma vez por (S, r, σ) e compartilhada entre sessões
+        vol = model_surface(S, r, "heston", (("v0", sigma**2), ("theta", sigma**2)))
+
+    # Curvas em cache compartilhado entre sessões, chaveadas pela grade de S e pelos parâmetros da opção
+    S_range, results = pricing_grid(0.5*K, 1.5*K, 100, K, T, r, vol, option_type, dtype=dtype)
+    profiler.mark("pricing")
+    create_responsive_plot(plot_single_greek, S_range=S_range, values=results[greek.lower()], greek=greek)
     st.caption(f"Gráfico mostrando a {greek} em função do preço do ativo.")
+    if vol_source != "Constante (σ)":
+        st.caption(f"Volatilidade lida na superfície em K = {K:.0f} e T = {T:.1f}: {vol(K, T):.2%} "
+                   f"(SVI ajustada em {len(vol.expiries)} vencimentos).")
+
+    # Superfícies de preço e Gregas sobre (S, T) ou (S, σ)
+    st.subheader("Superfícies")
+    st.write("""
+    Em vez de variar apenas o preço do ativo, a superfície mostra como o preço ou uma Grega muda quando o preço do ativo e o **tempo até o vencimento** (ou a **volatilidade**) variam ao mesmo tempo.
+    """)
+    scol1, scol2 = st.columns(2)
+    with scol1:
+        surface_axis = st.radio("Segundo Eixo", ["Tempo (T)", "Volatilidade (σ)"], horizontal=True)
+        surface_value = st.selectbox("Grandeza", ["Preço", "Delta", "Gamma", "Theta", "Vega", "Rho"])
+        surface_kind = st.radio("Visualização", ["Superfície 3D", "Mapa de Calor"], horizontal=True)
+    with scol2:
+        grid_points = st.select_slider("Pontos da Grade por Eixo", [50, 100, 250, 500, 1000], value=250)
+        # O Streamlit não informa o tamanho da janela: o usuário escolhe a tela e a
+        # grade calculada é reduzida a esse limite de pontos antes de ir ao navegador
+        screen = st.selectbox("Tamanho da Tela", ["Celular", "Notebook", "Monitor"], index=1)
+    display_points = {"Celular": 40, "Notebook": 80, "Monitor": 150}[screen]
+    if surface_kind == "Mapa de Calor":
+        # Um mapa de calor é bem mais leve de desenhar que uma malha 3D
+        display_points *= 2
+    profiler.mark("widgets")
+
+    from derivatives import downsample_surface, greek_surface, precision_loss
+
+    S_surface = np.linspace(0.5*K, 1.5*K, grid_points, dtype=dtype)
+    if surface_axis == "Tempo (T)":
+        y_surface, y_label, axis = np.linspace(0.01, 2.0, grid_points, dtype=dtype), "Tempo até Vencimento (anos)", "T"
+    else:
+        y_surface, y_label, axis = np.linspace(0.01, 0.5, grid_points, dtype=dtype), "Volatilidade (σ)", "sigma"
+    # No eixo σ a volatilidade é o próprio eixo; no eixo T a superfície é lida em cada prazo
+    surface_sigma = sigma if axis == "sigma" else vol
+    surface = greek_surface(S_surface, y_surface, axis, K, T, r, surface_sigma, option_type, dtype=dtype)
+    key = "price" if surface_value == "Preço" else surface_value.lower()
+    x_plot, y_plot, z_plot = downsample_surface(S_surface, y_surface, surface[key], display_points)
+    profiler.mark("pricing")
+
+    import plotly.graph_objects as go
+
+    if surface_kind == "Superfície 3D":
+        fig = go.Figure(go.Surface(x=x_plot, y=y_plot, z=z_plot, colorscale="Viridis"))
+        fig.update_layout(scene=dict(xaxis_title="Preço do Ativo", yaxis_title=y_label, zaxis_title=surface_value),
+                          height=600, margin=dict(l=0, r=0, t=30, b=0))
+    else:
+        fig = go.Figure(go.Heatmap(x=x_plot, y=y_plot, z=z_plot, colorscale="Viridis",
+                                   colorbar=dict(title=surface_value)))
+        fig.update_layout(xaxis_title="Preço do Ativo", yaxis_title=y_label, height=500)
+    st.plotly_chart(fig, use_container_width=True)
+    profiler.mark("plotly")
+    st.caption(f"{surface_value} calculado em {grid_points}x{grid_points} pontos e exibido em "
+               f"{len(y_plot)}x{len(x_plot)}.")
+
+    if dtype == "float32":
+        # Mesma superfície em float64 como referência para medir a perda de precisão
+        reference = greek_surface(S_surface.astype(np.float64), y_surface.astype(np.float64), axis, K, T, r, surface_sigma, option_type)
+        loss = precision_loss(reference, surface)
+        profiler.mark("pricing")
+        st.subheader("Precisão float32 vs. float64")
+        col1, col2 = st.columns(2)
+        col1.metric("Memória da Superfície (float32)", f"{sum(v['compact_bytes'] for v in loss.values()) / 2**20:.1f} MB")
+        col2.metric("Memória da Superfície (float64)", f"{sum(v['reference_bytes'] for v in loss.values()) / 2**20:.1f} MB")
+        st.dataframe(pd.DataFrame({
+            "Grandeza": ["Preço" if name == "price" else name.capitalize() for name in loss],
+            "Erro Absoluto Máximo": [v["max_abs_error"] for v in loss.values()],
+            "Erro Relativo Máximo": [v["max_rel_error"] for v in loss.values()],
+        }), hide_index=True)
+        st.caption("O float32 tem cerca de 7 dígitos significativos: erros relativos perto de 1e-6 são invisíveis em um gráfico, "
+                   "mas não servem para diferenças pequenas entre preços, como em Gregas por diferenças finitas.")
 
 # Seção: Simulador Avançado
 elif page == "Simulador Avançado":
@@ -580,6 +989,7 @@ elif page == "Simulador Avançado":
     - **Interatividade:** Ajuste os parâmetros da opção e observe como tanto o preço quanto as Gregas respondem em tempo real.
     - **Comparação de Gregas:** Compare diferentes Gregas para entender suas inter-relações e impactos no preço da opção.
     """)
+    profiler.mark("content")
 
     # Parâmetros
     col1, col2 = st.columns(2)
@@ -594,23 +1004,10 @@ elif page == "Simulador Avançado":
 
     # Seleção da Grega
     greek = st.selectbox("Selecione a Grega para visualizar", ["Delta", "Gamma", "Theta", "Vega", "Rho"])
+    profiler.mark("widgets")
 
     # Criação do gráfico com múltiplos eixos
-    def plot_greek_and_price(ax, S_range, K, T, r, sigma, option_type, greek):
-        # Cálculo do preço
-        prices = [calculate_option_price(S_val, K, T, r, sigma, option_type) for S_val in S_range]
-        # Cálculo da Grega
-        if greek == "Delta":
-            values = [calculate_delta(S_val, K, T, r, sigma, option_type) for S_val in S_range]
-        elif greek == "Gamma":
-            values = [calculate_gamma(S_val, K, T, r, sigma) for S_val in S_range]
-        elif greek == "Theta":
-            values = [calculate_theta(S_val, K, T, r, sigma, option_type) for S_val in S_range]
-        elif greek == "Vega":
-            values = [calculate_vega(S_val, K, T, r, sigma) for S_val in S_range]
-        elif greek == "Rho":
-            values = [calculate_rho(S_val, K, T, r, sigma, option_type) for S_val in S_range]
-
+    def plot_greek_and_price(ax, S_range, prices, values, greek):
         color_price = 'tab:blue'
         color_greek = 'tab:red'
 
@@ -627,10 +1024,14 @@ elif page == "Simulador Avançado":
         fig.tight_layout()
         ax.grid(True)
 
-    S_range = np.linspace(0.5*K, 1.5*K, 100)
-    fig, ax = plt.subplots()
-    plot_greek_and_price(ax, S_range, K, T, r, sigma, option_type, greek)
+    # Preço e Gregas em cache compartilhado entre sessões, chaveados pela grade de S e pelos parâmetros da opção
+    S_range, results = pricing_grid(0.5*K, 1.5*K, 100, K, T, r, sigma, option_type)
+    profiler.mark("pricing")
+    fig, ax = session_figure("greek_and_price")
+    plot_greek_and_price(ax, S_range, results["price"], results[greek.lower()], greek)
+    profiler.mark("plot")
     st.pyplot(fig)
+    profiler.mark("rasterize")
     st.caption(f"Gráfico mostrando o preço da opção e a {greek} em função do preço do ativo.")
 
 # Seção: Compradores vs. Vendedores
@@ -643,8 +1044,9 @@ elif page == "Compradores vs. Vendedores":
 
     st.subheader("Como Funciona")
     st.write("""
-    - **Força dos Compradores/Vendedores:** Controle deslizante que ajusta a força relativa dos compradores e vendedores.
-    - **Rastro do Preço:** O gráfico exibe o movimento do preço do ativo ao longo do tempo, deixando um rastro que mostra como as forças aplicadas influenciam o preço.
+    - **Livro de Ofertas:** Muitos agentes enviam ordens limitadas (que ficam no livro esperando), ordens a mercado (que consomem as melhores ofertas do outro lado) e cancelamentos.
+    - **Força dos Compradores/Vendedores:** Controle deslizante que ajusta a proporção de ordens a mercado de compra e de venda.
+    - **Rastro do Preço:** O gráfico exibe o preço médio entre a melhor compra e a melhor venda ao longo do tempo, junto com o spread e a profundidade do livro.
     """)
 
     st.subheader("Simulação Interativa")
@@ -652,48 +1054,62 @@ elif page == "Compradores vs. Vendedores":
     Ajuste a força dos compradores e vendedores para ver como isso impacta o preço do ativo em tempo real.
     """)
 
+    profiler.mark("content")
+
     if 'forca' not in st.session_state:
         st.session_state['forca'] = 0.0
 
     forca = st.sidebar.slider("Força dos Compradores/Vendedores (-1 a 1)", min_value=-1.0, max_value=1.0, value=st.session_state['forca'], step=0.1)
     st.session_state['forca'] = forca
 
-    price_chart = st.empty()
-
-    preco_inicial = 100
-    precos = [preco_inicial]
-    forcas = [forca]
-    t = [0]
-
-    run_simulation = st.button("Iniciar Simulação")
-
-    if run_simulation:
-        for i in range(1, 200):
-            forca = st.session_state['forca']
-            forcas.append(forca)
-            t.append(i)
+    n_passos, fps, duracao = animation_controls()
 
-            delta_preco = np.random.normal(loc=forca, scale=1)
-            novo_preco = precos[-1] + delta_preco
-            precos.append(novo_preco)
+    eventos_por_passo = st.slider("Eventos (ordens e cancelamentos) por Passo", 100, 10_000, 1_000, 100)
 
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=t, y=precos, mode='lines', name='Preço', yaxis='y1'))
-            fig.add_trace(go.Scatter(x=t, y=forcas, mode='lines', name='Força', yaxis='y2'))
-
-            fig.update_layout(
-                title='Evolução do Preço do Ativo e Força dos Agentes',
-                xaxis=dict(title='Tempo'),
-                yaxis=dict(title='Preço', side='left'),
-                yaxis2=dict(title='Força', overlaying='y', side='right'),
-                showlegend=True
-            )
-
-            price_chart.plotly_chart(fig, use_container_width=True)
-
-            time.sleep(0.1)
+    preco_inicial = 100
 
-        st.success("Simulação concluída.")
+    # O livro de ofertas vive na sessão entre os quadros; a força e os eventos por
+    # passo são lidos a cada quadro, então mudá-los no meio da execução vale na hora
+    run = simulation_controls("livro", lambda: OrderBook(initial_price=preco_inicial))
+    profiler.mark("widgets")
+
+    @st.fragment(run_every=1 / fps if run["running"] else None)
+    def quadro_livro():
+        # Cada quadro é uma execução própria do fragmento, medida à parte do profiler da página
+        quadro = RerunProfiler(f"{page}/frame", st.session_state['session_id'])
+        run = simulation_run("livro")
+        # Com menos passos escolhidos no meio da execução, ela já pode ter terminado
+        if run["running"] and run["step"] >= n_passos:
+            run["running"] = False
+            st.rerun()
+        if run["running"]:
+            n = max(0, min(steps_per_frame(n_passos, fps, duracao), n_passos - run["step"]))
+            registro = run["engine"].simulate(n * eventos_por_passo, forca=st.session_state['forca'],
+                                              record_every=eventos_por_passo)
+            append_history(run, mid=registro["mid_price"], spread=registro["spread"],
+                           compra=registro["bid_depth"], venda=registro["ask_depth"])
+            run["step"] += n
+            quadro.mark("simulation")
+
+        st.caption("Preço Médio (entre a melhor compra e a melhor venda)")
+        st.line_chart(history_frame(run, {"mid": "Preço Médio"}))
+        st.caption("Spread e Profundidade do Livro")
+        col1, col2 = st.columns(2)
+        col1.line_chart(history_frame(run, {"spread": "Spread"}))
+        col2.line_chart(history_frame(run, {"compra": "Compra", "venda": "Venda"}))
+        st.progress(min(1.0, run["step"] / n_passos), text=f"Passo {run['step']:,} de {n_passos:,}")
+        quadro.mark("plot")
+        if run["engine"] is not None:
+            st.metric("Eventos por Segundo (motor do livro)", f"{run['engine'].events_per_second():,.0f}")
+        if run["running"] and run["step"] >= n_passos:
+            run["running"] = False
+            st.rerun()
+        elif not run["running"] and run["step"] >= n_passos:
+            st.success("Simulação concluída.")
+        record_profile(quadro.finish())
+
+    quadro_livro()
+    profiler.mark("simulation")
 
     st.subheader("Interpretação dos Resultados")
     st.write("""
@@ -702,6 +1118,27 @@ elif page == "Compradores vs. Vendedores":
     - **Equilíbrio:** Força equilibrada mantém o preço estável.
     """)
 
+# Painel de desempenho: tempos desta execução e histórico da sessão, exportável em
+# JSON lines. Com DERIVATIVES_PROFILE_LOG definido, todas as execuções de todas as
+# sessões também são gravadas nesse arquivo para agregar p50/p95 em produção.
+profile = profiler.finish()
+record_profile(profile)
+profile_history = st.session_state['profile_history']
+
+if show_profiler:
+    with st.sidebar.expander("Desempenho da Página", expanded=True):
+        st.write(f"Última execução: **{profile['total'] * 1000:.1f} ms**")
+        st.write(f"Memória do processo (RSS): **{profile['rss'] / 2**20:.0f} MB** · "
+                 f"figuras pyplot abertas: **{pyplot_figure_count()}** · "
+                 f"figuras reaproveitadas nesta sessão: **{len(st.session_state.get('figure_pool', ()))}**")
+        st.dataframe(pd.DataFrame({"ms": {stage: seconds * 1000 for stage, seconds in profile['stages'].items()}}).round(2))
+        summary = summarize(profile_history)
+        st.write("Execuções desta sessão (ms):")
+        st.dataframe(pd.DataFrame({page_name: {"execuções": stats["reruns"], "p50": stats["p50"] * 1000, "p95": stats["p95"] * 1000}
+                                   for page_name, stats in summary.items()}).T.round(1))
+        st.download_button("Exportar (JSON lines)", to_jsonl(profile_history), file_name="perfil_execucoes.jsonl",
+                           mime="application/jsonl")
+
 # Rodapé
 st.sidebar.markdown("---")
 st.sidebar.info("Desenvolvido por Etore-BeS")
\ No newline at end of file
@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS = ["images/IMG_1269.jpg", "videos/galton_board.mp4"]
+
+# Cada modo roda em um processo novo: N "sessões" carregam os arquivos ao mesmo tempo,
+# lendo cada um do disco (como antes) ou pelo cache compartilhado do processo
+SESSION_SNIPPET = """
+import json, os
+from derivatives.assets import AssetCache
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+cache = AssetCache()
+before = rss()
+if {mode!r} == "per_session":
+    sessions = [[open(path, "rb").read() for path in {paths!r}] for _ in range({sessions})]
+else:
+    sessions = [[cache.get(path) for path in {paths!r}] for _ in range({sessions})]
+print(json.dumps({{"rss_delta": rss() - before}}))
+"""
+
+
+def measure(mode, sessions):
+    code = SESSION_SNIPPET.format(mode=mode, paths=ASSETS, sessions=sessions)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)["rss_delta"]
+
+
+# Memória residente com N sessões simultâneas: cópia por sessão vs. cache compartilhado
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memória residente dos arquivos estáticos com N sessões simultâneas.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100])
+    args = parser.parse_args(argv)
+
+    asset_bytes = sum(os.path.getsize(os.path.join(ROOT, path)) for path in ASSETS)
+    for sessions in args.sessions:
+        per_session = measure("per_session", sessions)
+        shared = measure("shared", sessions)
+        print(json.dumps({
+            "sessions": sessions,
+            "asset_mb": asset_bytes / 2**20,
+            "per_session_rss_mb": per_session / 2**20,
+            "shared_cache_rss_mb": shared / 2**20,
+            "saved_mb": (per_session - shared) / 2**20,
+        }))
+
+
+if __name__ == "__main__":
+    main()
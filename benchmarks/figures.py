@@ -0,0 +1,60 @@
+import argparse
+import gc
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Páginas que desenham com matplotlib e o slider mexido a cada rerun em cada uma
+WORKLOAD = [
+    ("Conceitos Básicos", "Média (μ)", [-2.0, 0.0, 2.0]),
+    ("Simulador Avançado", "Preço do Ativo (S)", [80.0, 100.0, 120.0]),
+]
+
+
+# Reruns sustentados via streamlit.testing no próprio processo: a cada rerun um
+# slider muda de valor, como um usuário arrastando. Registra RSS e figuras abertas
+# no pyplot a cada `report_every` reruns.
+def run(app, reruns, report_every):
+    from streamlit.testing.v1 import AppTest
+
+    from derivatives.figures import pyplot_figure_count
+    from derivatives.profiling import rss_bytes
+
+    sessions = []
+    for page, _, _ in WORKLOAD:
+        at = AppTest.from_file(app, default_timeout=120)
+        at.run()
+        at.sidebar.radio[0].set_value(page).run()
+        sessions.append(at)
+
+    for i in range(1, reruns + 1):
+        at = sessions[i % len(sessions)]
+        _, label, values = WORKLOAD[i % len(sessions)]
+        slider = next(s for s in at.slider if s.label == label)
+        slider.set_value(values[i % len(values)]).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        if i % report_every == 0:
+            gc.collect()
+            yield {"reruns": i, "rss_mb": rss_bytes() / 2**20, "pyplot_figures": pyplot_figure_count(),
+                   "pooled_figures": sum(len(s.session_state["figure_pool"]) for s in sessions
+                                         if "figure_pool" in s.session_state)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RSS e figuras matplotlib abertas ao longo de reruns sustentados.")
+    parser.add_argument("--reruns", type=int, default=300)
+    parser.add_argument("--report-every", type=int, default=50)
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"),
+                        help="script do app (útil para comparar com outra revisão)")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    for row in run(os.path.abspath(args.app), args.reruns, args.report_every):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
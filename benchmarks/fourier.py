@@ -0,0 +1,28 @@
+import argparse
+import json
+
+import numpy as np
+
+from derivatives.fourier import MODELS, fft_convergence
+
+
+# Erro contra a referência sem FFT e tempo por grade de strikes de cada modelo: a
+# FFT custa o mesmo para 10 ou 1000 strikes, então o custo por strike cai com a grade
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Erro e tempo do pricer por FFT (Carr-Madan) por modelo e grade de strikes.")
+    parser.add_argument("--models", nargs="+", choices=list(MODELS), default=list(MODELS))
+    parser.add_argument("--strikes", type=int, nargs="+", default=[10, 100, 1000], help="strikes por grade")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 4096, 16384], help="pontos da FFT")
+    parser.add_argument("--option-type", choices=["Call", "Put"], default="Call")
+    args = parser.parse_args(argv)
+
+    for model in args.models:
+        for n_strikes in args.strikes:
+            strikes = np.linspace(60.0, 140.0, n_strikes)
+            for row in fft_convergence(100.0, 1.0, 0.05, model, None, strikes, args.option_type, args.sizes):
+                row["microseconds_per_strike"] = row["milliseconds"] * 1000 / n_strikes
+                print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["Introdução", "Conceitos Básicos", "Compradores vs. Vendedores", "Galton Board",
+         "Movimento Browniano", "Opções", "Black-Scholes", "Gregas", "Simulador Avançado"]
+
+
+# Teste de carga sem navegador nem rede: várias sessões simuladas com
+# streamlit.testing no mesmo processo, intercaladas uma ação por vez como usuários
+# simultâneos dividindo um servidor. Cada ação é um rerun: trocar de página no menu
+# ou mexer num controle da página atual. Sliders e campos numéricos são "arrastados"
+# em rajadas de alguns passos na mesma direção, como quem procura um valor; caixas
+# de seleção trocam de opção. Botões e select_sliders (tamanho das simulações) ficam
+# de fora, para que a carga não seja dominada por uma única execução gigante.
+#
+# Por página: latência de rerun (p50/p95/p99), tempo de CPU por rerun e RSS de pico.
+# As ações vêm de geradores com semente, então duas revisões do app recebem a mesma
+# sequência e os relatórios JSON podem ser comparados (diff ou --baseline).
+
+class Session:
+    def __init__(self, app, seed, navigate_probability):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(app, default_timeout=300)
+        self.rng = np.random.default_rng(seed)
+        self.navigate_probability = navigate_probability
+        self.burst = []
+
+    @property
+    def page(self):
+        return self.at.sidebar.radio[0].value
+
+    def _controls(self):
+        sliders = [w for w in self.at.main.slider if not isinstance(w.value, (tuple, list))]
+        return sliders + list(self.at.main.number_input) + list(self.at.main.selectbox)
+
+    # Próxima ação: continua a rajada em andamento, troca de página ou começa uma
+    # rajada nova num controle sorteado
+    def _next_action(self):
+        if self.burst:
+            return self.burst.pop(0)
+        controls = self._controls()
+        if not controls or self.rng.random() < self.navigate_probability:
+            return ("page", str(self.rng.choice([p for p in PAGES if p != self.page])))
+        widget = controls[self.rng.integers(len(controls))]
+        if widget.type == "selectbox":
+            return ("select", widget.label, str(self.rng.choice(widget.options)))
+        direction = 1 if self.rng.random() < 0.5 else -1
+        moves = int(self.rng.integers(1, 6))
+        distance = int(self.rng.integers(1, 4))
+        self.burst = [("drag", widget.type, widget.label, direction * distance)] * (moves - 1)
+        return ("drag", widget.type, widget.label, direction * distance)
+
+    def _find(self, kind, label):
+        return next((w for w in getattr(self.at.main, kind) if w.label == label), None)
+
+    def _apply(self, action):
+        if action[0] == "page":
+            self.at.sidebar.radio[0].set_value(action[1])
+            return
+        if action[0] == "select":
+            widget = self._find("selectbox", action[1])
+            if widget is not None:
+                widget.set_value(action[2])
+            return
+        _, kind, label, steps = action
+        widget = self._find(kind, label)
+        if widget is None:  # a rajada sobreviveu a uma mudança de página
+            self.burst = []
+            return
+        step = widget.step or 1
+        value = widget.value + steps * step
+        low = widget.min if widget.min is not None else value
+        high = widget.max if widget.max is not None else value
+        if value > high or value < low:  # bate no fim do trilho e volta
+            value = widget.value - steps * step
+            self.burst = [(a[0], a[1], a[2], -a[3]) for a in self.burst]
+        value = min(max(value, low), high)
+        widget.set_value(type(widget.value)(round(value / step) * step))
+
+    # Executa um rerun e devolve (página, segundos, segundos de CPU, RSS, exceção)
+    def step(self, first=False):
+        from derivatives.profiling import rss_bytes
+
+        if not first:
+            self._apply(self._next_action())
+        wall, cpu = time.perf_counter(), time.process_time()
+        self.at.run()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        return self.page, wall, cpu, rss_bytes(), bool(self.at.exception)
+
+
+def run(app, sessions, actions, seed=0, navigate_probability=0.15):
+    pool = [Session(app, seed + i, navigate_probability) for i in range(sessions)]
+    samples = {page: {"wall": [], "cpu": [], "rss": [], "exceptions": 0} for page in PAGES}
+
+    def record(page, wall, cpu, rss, exception):
+        sample = samples[page]
+        sample["wall"].append(wall)
+        sample["cpu"].append(cpu)
+        sample["rss"].append(rss)
+        sample["exceptions"] += exception
+
+    # O primeiro rerun de cada sessão paga importações e caches frios; fica à parte
+    # para não inflar os percentis da página inicial
+    startup = [session.step(first=True)[1] for session in pool]
+    start = time.perf_counter()
+    for _ in range(actions):
+        for session in pool:
+            record(*session.step())
+    elapsed = time.perf_counter() - start
+    return samples, startup, elapsed
+
+
+def percentiles_ms(values):
+    p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+    return {"p50": round(p50, 1), "p95": round(p95, 1), "p99": round(p99, 1)}
+
+
+# Relatório JSON estável (páginas sempre na mesma ordem, valores arredondados)
+def report(samples, startup, elapsed, meta):
+    pages = {}
+    for page in PAGES:
+        sample = samples[page]
+        if not sample["wall"]:
+            continue
+        pages[page] = {
+            "reruns": len(sample["wall"]),
+            "exceptions": sample["exceptions"],
+            "latency_ms": percentiles_ms(sample["wall"]),
+            "cpu_ms": percentiles_ms(sample["cpu"]),
+            # Fração do rerun gasta em CPU; perto de 1 significa que, com um núcleo,
+            # sessões simultâneas nessa página se enfileiram
+            "cpu_fraction": round(sum(sample["cpu"]) / sum(sample["wall"]), 3),
+            "peak_rss_mb": round(max(sample["rss"]) / 2**20, 1),
+        }
+    all_wall = [w for sample in samples.values() for w in sample["wall"]]
+    all_cpu = [c for sample in samples.values() for c in sample["cpu"]]
+    return {
+        "meta": meta,
+        "pages": pages,
+        "total": {
+            "startup_ms": percentiles_ms(startup),
+            "reruns": len(all_wall),
+            "seconds": round(elapsed, 2),
+            "reruns_per_second": round(len(all_wall) / elapsed, 2),
+            "latency_ms": percentiles_ms(all_wall),
+            "cpu_ms": percentiles_ms(all_cpu),
+            "peak_rss_mb": round(max(max(s["rss"]) for s in samples.values() if s["rss"]) / 2**20, 1),
+        },
+    }
+
+
+# Compara o p95 de latência por página com uma linha de base; devolve as páginas
+# que pioraram além do limite
+def compare(current, baseline, threshold):
+    regressions = []
+    for page, row in current["pages"].items():
+        base = baseline["pages"].get(page)
+        if base is None:
+            continue
+        change = row["latency_ms"]["p95"] / base["latency_ms"]["p95"] - 1
+        print(f"{page:<28} p95 {base['latency_ms']['p95']:>9.1f} -> {row['latency_ms']['p95']:>9.1f} ms {change:+7.1%}"
+              f"   RSS {base['peak_rss_mb']:>7.1f} -> {row['peak_rss_mb']:>7.1f} MB", file=sys.stderr)
+        if change > threshold:
+            regressions.append(page)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Teste de carga local do app: sessões simuladas navegando e arrastando controles, "
+                    "com latência de rerun, CPU e RSS de pico por página.")
+    parser.add_argument("--sessions", type=int, default=8, help="sessões simultâneas")
+    parser.add_argument("--actions", type=int, default=25, help="ações (reruns) por sessão")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--navigate", type=float, default=0.15, help="probabilidade de trocar de página a cada ação")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"),
+                        help="script do app (útil para comparar com outra revisão)")
+    parser.add_argument("--output", default="-", help="arquivo JSON com o relatório (padrão: stdout)")
+    parser.add_argument("--baseline", help="relatório anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="piora relativa máxima do p95 antes de falhar (padrão: 0.25)")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    import streamlit
+
+    samples, startup, elapsed = run(os.path.abspath(args.app), args.sessions, args.actions, args.seed, args.navigate)
+    meta = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sessions": args.sessions,
+        "actions": args.actions,
+        "seed": args.seed,
+    }
+    current = report(samples, startup, elapsed, meta)
+
+    if args.output == "-":
+        json.dump(current, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} páginas com p95 acima de {args.threshold:.0%}: {', '.join(regressions)}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+import argparse
+import json
+
+from derivatives.pde import SCHEMES, fd_convergence
+
+
+# Precisão por milissegundo de cada esquema de diferenças finitas contra a fórmula
+# fechada, para tamanhos de grade crescentes
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Erro vs. fórmula fechada e tempo dos esquemas de diferenças finitas.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400, 800], help="pontos de preço da grade")
+    parser.add_argument("--schemes", nargs="+", choices=list(SCHEMES), default=list(SCHEMES))
+    parser.add_argument("--option-type", choices=["Call", "Put"], default="Call")
+    args = parser.parse_args(argv)
+
+    for row in fd_convergence(100.0, 100.0, 1.0, 0.05, 0.2, args.option_type, args.sizes, args.schemes):
+        row["price_error_x_ms"] = row["price_error"] * row["milliseconds"]
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from derivatives import black_scholes
+
+# Parâmetros (S, K, T, r, sigma) de cada regime
+REGIMES = {
+    "atm": (100.0, 100.0, 1.0, 0.05, 0.2),
+    "deep_itm": (200.0, 100.0, 1.0, 0.05, 0.2),
+    "deep_otm": (50.0, 100.0, 1.0, 0.05, 0.2),
+    "short_t": (100.0, 100.0, 1 / 365, 0.05, 0.2),
+}
+GRID_SIZES = [10**k for k in range(2, 8)]
+OPTION_TYPES = ["Call", "Put"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "pricing_baseline.json")
+
+
+# Menor tempo por chamada entre `repeat` medições, cada uma com chamadas suficientes
+# para durar ao menos `min_time` segundos
+def best_time(func, repeat=5, min_time=0.1):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / number
+
+
+def scalar_cases():
+    for name in ["calculate_option_price", "calculate_delta", "calculate_theta", "calculate_rho"]:
+        for option_type in OPTION_TYPES:
+            for regime, params in REGIMES.items():
+                yield name, regime, option_type, params + (option_type,)
+    for name in ["calculate_gamma", "calculate_vega"]:
+        for regime, params in REGIMES.items():
+            yield name, regime, None, params
+
+
+def grid_cases(max_size):
+    for size in [n for n in GRID_SIZES if n <= max_size]:
+        for option_type in OPTION_TYPES:
+            for regime in REGIMES if size == 10**5 else ["atm"]:
+                yield size, regime, option_type
+
+
+# Grade de S em torno do S do regime (±20%), como nas páginas de Gregas
+def grid_inputs(size, regime):
+    S, K, T, r, sigma = REGIMES[regime]
+    return np.linspace(0.8 * S, 1.2 * S, size), K, T, r, sigma
+
+
+def run(max_size=10**7, repeat=5):
+    results = []
+    for name, regime, option_type, args in scalar_cases():
+        func = getattr(black_scholes, name)
+        seconds = best_time(lambda: func(*args), repeat)
+        results.append({"name": f"scalar/{name}/{option_type or 'any'}/{regime}", "mode": "scalar", "size": 1,
+                        "seconds": seconds, "ns_per_option": seconds * 1e9})
+    for size, regime, option_type in grid_cases(max_size):
+        S, K, T, r, sigma = grid_inputs(size, regime)
+        seconds = best_time(lambda: black_scholes.price_and_greeks(S, K, T, r, sigma, option_type),
+                            repeat if size < 10**6 else 3, min_time=0.0)
+        results.append({"name": f"grid/price_and_greeks/{option_type}/{regime}/{size}", "mode": "grid", "size": size,
+                        "seconds": seconds, "ns_per_option": seconds * 1e9 / size})
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+# Compara ns/opção com a linha de base; devolve as linhas que pioraram além do limite
+def compare(current, baseline, threshold):
+    base = {row["name"]: row["ns_per_option"] for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        if row["name"] not in base:
+            continue
+        change = row["ns_per_option"] / base[row["name"]] - 1
+        row["baseline_ns_per_option"] = base[row["name"]]
+        row["change"] = change
+        if change > threshold:
+            regressions.append(row)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks das funções de preço e Gregas.")
+    parser.add_argument("--output", default="-", help="arquivo JSON com os resultados (padrão: stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="linha de base para comparação")
+    parser.add_argument("--save-baseline", action="store_true", help="grava os resultados como nova linha de base")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="piora relativa máxima de ns/opção antes de falhar (padrão: 0.25)")
+    parser.add_argument("--max-size", type=int, default=10**7, help="maior grade medida")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # Sem linha de base não há como detectar regressões: falha antes de medir em vez
+    # de sair com 0 (o diretório padrão results/ não é versionado)
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"linha de base não encontrada: {args.baseline}; grave uma com --save-baseline "
+              "ou indique outra com --baseline", file=sys.stderr)
+        return 2
+
+    current = run(args.max_size, args.repeat)
+    regressions = []
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+    else:
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+
+    for row in current["results"]:
+        change = f"{row['change']:+7.1%}" if "change" in row else ""
+        print(f"{row['name']:<55} {row['ns_per_option']:>12.1f} ns/opção {change}", file=sys.stderr)
+
+    if args.output == "-":
+        json.dump(current, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if regressions:
+        print(f"{len(regressions)} regressões acima de {args.threshold:.0%}:", file=sys.stderr)
+        for row in regressions:
+            print(f"  {row['name']}: {row['baseline_ns_per_option']:.1f} -> {row['ns_per_option']:.1f} ns/opção",
+                  file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import argparse
+import json
+
+import numpy as np
+from scipy.special import ndtr
+
+from benchmarks.pricing import REGIMES, best_time
+from derivatives import black_scholes
+from derivatives.black_scholes import SCALAR_CDF_MAX_ERROR, SCALAR_CDFS
+
+# Cada modo do caminho escalar -> argumentos extras de price_and_greeks
+MODES = {
+    "vectorized": {"fast": False},
+    "fast_erf": {"fast": True, "cdf": "erf"},
+    "fast_abramowitz_stegun": {"fast": True, "cdf": "abramowitz-stegun"},
+}
+
+
+# Latência por contrato (preço + cinco Gregas) do kernel vetorizado com entradas
+# escalares contra o caminho escalar com cada CDF, e erro máximo de cada CDF vs. ndtr
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latência escalar de preço + Gregas: kernel vetorizado vs. caminho rápido.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    x = np.linspace(-10, 10, 200_001)
+    for name, cdf in SCALAR_CDFS.items():
+        measured = max(abs(cdf(v) - reference) for v, reference in zip(x.tolist(), ndtr(x).tolist()))
+        print(json.dumps({"cdf": name, "documented_max_error": SCALAR_CDF_MAX_ERROR[name], "measured_max_error": measured}))
+
+    for regime, params in REGIMES.items():
+        for option_type in ("Call", "Put"):
+            row = {"regime": regime, "option_type": option_type}
+            exact = black_scholes.price_and_greeks(*params, option_type, fast=False)
+            for mode, kwargs in MODES.items():
+                seconds = best_time(lambda: black_scholes.price_and_greeks(*params, option_type, **kwargs), args.repeat)
+                result = black_scholes.price_and_greeks(*params, option_type, **kwargs)
+                row[f"{mode}_us"] = seconds * 1e6
+                row[f"{mode}_max_error"] = max(abs(float(result[k]) - float(exact[k])) for k in exact)
+            # As seis funções calculate_* separadas, como as páginas usavam antes do kernel único
+            for mode, fast in (("six_calls_vectorized", False), ("six_calls_fast", True)):
+                def six_calls():
+                    black_scholes.calculate_option_price(*params, option_type, fast)
+                    black_scholes.calculate_delta(*params, option_type, fast)
+                    black_scholes.calculate_gamma(*params, fast)
+                    black_scholes.calculate_theta(*params, option_type, fast)
+                    black_scholes.calculate_vega(*params, fast)
+                    black_scholes.calculate_rho(*params, option_type, fast)
+                row[f"{mode}_us"] = best_time(six_calls, args.repeat) * 1e6
+            row["speedup"] = row["vectorized_us"] / row["fast_erf_us"]
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
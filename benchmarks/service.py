@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Cliente HTTP mínimo com keep-alive: envia contratos aleatórios em sequência até o
+# prazo e guarda a latência de cada requisição
+async def client(host, port, deadline, latencies, seed):
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            body = json.dumps({
+                "S": float(rng.uniform(50, 150)), "K": 100.0, "T": float(rng.uniform(0.1, 2.0)),
+                "r": 0.05, "sigma": float(rng.uniform(0.1, 0.5)), "option_type": "Call" if rng.random() < 0.5 else "Put",
+            }).encode()
+            start = time.perf_counter()
+            writer.write(b"POST /price HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n" % len(body) + body)
+            await writer.drain()
+            headers = {}
+            status = await reader.readline()
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers["content-length"]))
+            if b" 200 " not in status:
+                raise RuntimeError(status.decode())
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, concurrency, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, deadline, latencies, seed) for seed in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {"requests": len(latencies), "requests_per_second": len(latencies) / elapsed,
+            "latency_ms": {"p50": p50, "p95": p95, "p99": p99}}
+
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"GET /stats HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+# Sobe o serviço em um processo separado com a janela dada e mede requisições/s e
+# latência vistas pelos clientes, junto com o tamanho médio de lote do servidor
+def measure(window_ms, concurrency, duration):
+    server = subprocess.Popen([sys.executable, "-m", "derivatives.service", "--port", "0", "--window", str(window_ms)],
+                              cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        port = json.loads(server.stdout.readline())["port"]
+        report = asyncio.run(run_load("127.0.0.1", port, concurrency, duration))
+        stats = asyncio.run(fetch_stats("127.0.0.1", port))
+    finally:
+        server.terminate()
+        server.wait()
+    return {"window_ms": window_ms, "concurrency": concurrency, **report,
+            "mean_batch": stats["mean_batch"], "largest_batch": stats["largest_batch"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de carga local para o serviço de precificação: requisições/s por janela de micro-lote.")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.0, 1.0, 2.0, 5.0, 10.0], help="janelas em milissegundos")
+    parser.add_argument("--concurrency", type=int, default=64, help="clientes simultâneos")
+    parser.add_argument("--duration", type=float, default=5.0, help="segundos de carga por janela")
+    args = parser.parse_args(argv)
+
+    for window in args.windows:
+        print(json.dumps(measure(window, args.concurrency, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
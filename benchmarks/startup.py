@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["Introdução", "Conceitos Básicos", "Compradores vs. Vendedores", "Galton Board",
+         "Movimento Browniano", "Opções", "Black-Scholes", "Gregas", "Simulador Avançado"]
+
+HEAVY_MODULES = ["streamlit", "matplotlib", "plotly", "PIL", "scipy.stats"]
+
+# Cada medida roda em um interpretador novo, para que nada já esteja em sys.modules
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+PAGE_SNIPPET = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+start = time.perf_counter()
+at.run()
+at.sidebar.radio[0].set_value({page!r})
+page_start = time.perf_counter()
+at.run()
+end = time.perf_counter()
+print(json.dumps({{"first_render_seconds": end - page_start, "total_seconds": end - start,
+                   "loaded": [m for m in {heavy!r} if m in sys.modules],
+                   "exception": bool(at.exception)}}))
+"""
+
+
+def run_snippet(code):
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def measure_import(module, repeat=5):
+    runs = [run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+    return {"module": module, "seconds": min(run["seconds"] for run in runs), "loaded": runs[0]["loaded"]}
+
+
+def measure_page(page):
+    result = run_snippet(PAGE_SNIPPET.format(app=os.path.join(ROOT, "app.py"), page=page, heavy=HEAVY_MODULES))
+    return {"page": page, **result}
+
+
+# Tempo de importação a frio da biblioteca de precificação e tempo da primeira
+# renderização de cada página (em um processo novo, via streamlit.testing)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede importação a frio e primeira renderização das páginas.")
+    parser.add_argument("--repeat", type=int, default=5, help="importações a frio por módulo (usa o mínimo)")
+    parser.add_argument("--skip-pages", action="store_true", help="mede apenas os tempos de importação")
+    args = parser.parse_args(argv)
+
+    for module in ["derivatives", "derivatives.black_scholes", "derivatives.monte_carlo"]:
+        print(json.dumps(measure_import(module, args.repeat), ensure_ascii=False))
+    if not args.skip_pages:
+        for page in PAGES:
+            print(json.dumps(measure_page(page), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import argparse
+import json
+
+from derivatives.trees import TREE_METHODS, tree_convergence
+
+
+# Erro vs. fórmula fechada, prêmio americano e tempo de cada árvore por número de
+# passos, incluindo as escadas longas que a página não calcula a cada interação
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Erro vs. fórmula fechada e tempo das árvores binomial e trinomial.")
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 50, 100, 500, 1000, 5000], help="passos da árvore")
+    parser.add_argument("--methods", nargs="+", choices=list(TREE_METHODS), default=list(TREE_METHODS))
+    parser.add_argument("--option-type", choices=["Call", "Put"], default="Put")
+    args = parser.parse_args(argv)
+
+    for method in args.methods:
+        for row in tree_convergence(100.0, 100.0, 1.0, 0.05, 0.2, args.option_type, args.steps, method):
+            row["method"] = method
+            row["milliseconds"] = row.pop("seconds") * 1000
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
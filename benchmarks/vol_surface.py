@@ -0,0 +1,25 @@
+import argparse
+import json
+
+from derivatives.vol_surface import measure_throughput
+
+
+# Tempo de ajuste da superfície SVI e vazão das consultas vetorizadas de (K, T), para
+# cadeias de diferentes tamanhos e lotes de consulta crescentes
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de ajuste e vazão de consulta da superfície de volatilidade.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000, 1_000_000], help="pontos (K, T) por consulta")
+    parser.add_argument("--strikes", type=int, nargs="+", default=[10, 25, 100], help="strikes por vencimento")
+    parser.add_argument("--expiries", type=float, nargs="+", default=[0.1, 0.25, 0.5, 1.0, 2.0])
+    parser.add_argument("--noise", type=float, default=0.0, help="desvio do ruído gaussiano nas vols cotadas")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for n_strikes in args.strikes:
+        for row in measure_throughput(args.sizes, args.expiries, n_strikes, args.noise, repeat=args.repeat):
+            row["nanoseconds_per_lookup"] = row["lookup_microseconds"] * 1000 / row["lookups"]
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import importlib
+
+# Exportações carregadas sob demanda (PEP 562): `import derivatives` não importa
+# nenhum submódulo até que um nome seja usado.
+_EXPORTS = {
+    "AssetCache": "assets",
+    "assets": "assets",
+    "price_file": "batch",
+    "GREEKS": "black_scholes",
+    "FigurePool": "figures",
+    "fft_convergence": "fourier",
+    "fft_price": "fourier",
+    "calculate_delta": "black_scholes",
+    "calculate_gamma": "black_scholes",
+    "calculate_option_price": "black_scholes",
+    "calculate_rho": "black_scholes",
+    "calculate_theta": "black_scholes",
+    "calculate_vega": "black_scholes",
+    "configure_scalar_path": "black_scholes",
+    "precision_loss": "black_scholes",
+    "price_and_greeks": "black_scholes",
+    "LRUCache": "cache",
+    "lru_ttl_cache": "cache",
+    "pricing_grid": "cache",
+    "galton_histogram": "galton",
+    "implied_volatility": "implied_vol",
+    "gbm_paths": "monte_carlo",
+    "measure_speedup": "monte_carlo",
+    "monte_carlo_price": "monte_carlo",
+    "OrderBook": "order_book",
+    "fd_convergence": "pde",
+    "fd_price": "pde",
+    "RerunProfiler": "profiling",
+    "PricingService": "service",
+    "PRESETS": "strategies",
+    "Strategy": "strategies",
+    "downsample_surface": "surfaces",
+    "tree_convergence": "trees",
+    "tree_price": "trees",
+    "greek_surface": "surfaces",
+    "VolSurface": "vol_surface",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,49 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+# Cache de arquivos estáticos (imagens, vídeos) carregados uma única vez por processo
+# e compartilhados por todas as sessões. O total em memória é limitado a `max_bytes`,
+# com remoção do arquivo usado há mais tempo; arquivos maiores que o limite são lidos
+# sem serem guardados. A chave inclui mtime e tamanho, então arquivos alterados são relidos.
+class AssetCache:
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if len(data) <= self.max_bytes:
+            with self._lock:
+                if key not in self._data:
+                    self._data[key] = data
+                    self._size += len(data)
+                    while self._size > self.max_bytes:
+                        _, evicted = self._data.popitem(last=False)
+                        self._size -= len(evicted)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "files": len(self._data),
+                    "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+# Instância única do processo, usada pelas páginas do app
+assets = AssetCache()
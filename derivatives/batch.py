@@ -0,0 +1,202 @@
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .black_scholes import GREEKS, price_and_greeks
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Colunas esperadas no arquivo de entrada; option_type ("Call"/"Put") é opcional e vale Call
+INPUT_COLUMNS = ("S", "K", "T", "r", "sigma")
+OUTPUT_COLUMNS = ("price",) + GREEKS
+# Grafias aceitas em option_type, depois de strip() e casefold() -> tipo do kernel
+OPTION_TYPES = {"call": "Call", "c": "Call", "put": "Put", "p": "Put"}
+
+
+# Precificação em lote de arquivos grandes de contratos (CSV ou Parquet), fora da
+# interface. O arquivo é lido em blocos de tamanho fixo, cada bloco é precificado com
+# uma única chamada vetorizada do kernel e escrito na saída antes de o próximo ser
+# lido, então a memória não cresce com o tamanho do arquivo.
+
+def _file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension in (".csv", ".txt"):
+        return "csv"
+    raise ValueError(f"formato não suportado: {path!r} (use .csv ou .parquet)")
+
+
+# Gera DataFrames com até chunk_size linhas do arquivo de entrada. O índice de cada
+# bloco é o número da linha de dados no arquivo (a partir de 0), como no read_csv
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    if _file_format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+# Normaliza a coluna option_type (ex.: "call", " C ", "PUT") para "Call"/"Put". Valores
+# desconhecidos ou vazios seriam precificados como Put pelo kernel, então são
+# rejeitados, com as linhas em que aparecem.
+def _option_types(column):
+    normalized = column.astype("string").str.strip().str.casefold().map(OPTION_TYPES)
+    invalid = normalized.isna()
+    if invalid.any():
+        rows = column.index[invalid]
+        examples = ", ".join(f"linha {row}: {column[row]!r}" for row in rows[:10])
+        raise ValueError(f"option_type deve ser Call/Put (ou C/P); {len(rows)} valor(es) inválido(s) ({examples})")
+    return normalized.to_numpy(dtype=str)
+
+
+# Acrescenta preço e Gregas às colunas de um bloco. As colunas de entrada saem como
+# float64 e option_type normalizado: o read_csv infere os tipos bloco a bloco (um
+# bloco só com inteiros em S vira int64), e o Parquet exige o mesmo schema em todos.
+def price_chunk(chunk):
+    missing = [column for column in INPUT_COLUMNS if column not in chunk]
+    if missing:
+        raise ValueError(f"colunas ausentes no arquivo de entrada: {missing}")
+    inputs = {column: chunk[column].to_numpy(dtype=np.float64) for column in INPUT_COLUMNS}
+    if "option_type" in chunk:
+        inputs["option_type"] = _option_types(chunk["option_type"])
+    values = price_and_greeks(*(inputs[column] for column in INPUT_COLUMNS), inputs.get("option_type", "Call"))
+    return chunk.assign(**inputs, **{name: np.broadcast_to(values[name], len(chunk)) for name in OUTPUT_COLUMNS})
+
+
+# Escreve blocos incrementalmente com os writers em streaming do pyarrow (um row
+# group por bloco no Parquet; no CSV o cabeçalho sai só uma vez). O writer de CSV do
+# pyarrow é uma ordem de grandeza mais rápido que DataFrame.to_csv para floats.
+class ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.format = _file_format(path)
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is not None and not table.schema.equals(self._schema):
+            # Demais colunas do arquivo também podem mudar de tipo entre blocos
+            # (ex.: int64 em um, double no outro): segue o schema do primeiro bloco
+            table = table.cast(self._schema)
+        if self._writer is None:
+            self._schema = table.schema
+            if self.format == "parquet":
+                import pyarrow.parquet as pq
+
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                import pyarrow.csv as pa_csv
+
+                self._writer = pa_csv.CSVWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Precifica `input_path` em `output_path` bloco a bloco. Com n_workers > 1 os blocos
+# são precificados em processos separados, com no máximo 2 blocos por worker em voo,
+# e escritos na ordem original. `progress(rows, elapsed)` é chamado após cada bloco.
+def price_file(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, n_workers=1, progress=None):
+    start = time.perf_counter()
+    rows = 0
+    chunks = iter_chunks(input_path, chunk_size)
+    with ChunkWriter(output_path) as writer:
+        def emit(result):
+            nonlocal rows
+            writer.write(result)
+            rows += len(result)
+            if progress is not None:
+                progress(rows, time.perf_counter() - start)
+
+        if n_workers > 1:
+            with ProcessPoolExecutor(n_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                pending = collections.deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(price_chunk, chunk))
+                    if len(pending) >= 2 * n_workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+        else:
+            for chunk in chunks:
+                emit(price_chunk(chunk))
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else float("nan"),
+        "chunk_size": chunk_size,
+        "n_workers": n_workers,
+    }
+
+
+# Arquivo sintético de contratos para testes de carga do pricer em lote
+def write_sample(path, n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=0):
+    rng = np.random.default_rng(seed)
+    with ChunkWriter(path) as writer:
+        for offset in range(0, n_rows, chunk_size):
+            n = min(chunk_size, n_rows - offset)
+            S = rng.uniform(50, 150, n)
+            writer.write(pd.DataFrame({
+                "S": S,
+                "K": S * rng.uniform(0.7, 1.3, n),
+                "T": rng.uniform(0.05, 2.0, n),
+                "r": rng.uniform(0.0, 0.1, n),
+                "sigma": rng.uniform(0.05, 0.8, n),
+                "option_type": np.where(rng.random(n) < 0.5, "Call", "Put"),
+            }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Precifica um arquivo de contratos (CSV ou Parquet, colunas S, K, T, r, sigma "
+                    "e option_type opcional) em blocos, escrevendo preço e Gregas na saída.")
+    parser.add_argument("input", help="arquivo de entrada (.csv ou .parquet)")
+    parser.add_argument("output", help="arquivo de saída (.csv ou .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="linhas por bloco")
+    parser.add_argument("--workers", type=int, default=1, help="processos de precificação")
+    parser.add_argument("--sample", type=int, metavar="N",
+                        help="antes de precificar, gera em `input` um arquivo sintético com N contratos")
+    parser.add_argument("--quiet", action="store_true", help="não mostra o progresso em stderr")
+    args = parser.parse_args(argv)
+
+    if args.sample:
+        write_sample(args.input, args.sample, args.chunk_size)
+
+    def progress(rows, elapsed):
+        print(f"{rows:,} linhas, {rows / elapsed:,.0f} linhas/s", file=sys.stderr)
+
+    stats = price_file(args.input, args.output, args.chunk_size, args.workers, None if args.quiet else progress)
+    json.dump(stats, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
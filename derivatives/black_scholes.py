@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+from scipy.special import ndtr
+
+GREEKS = ("delta", "gamma", "theta", "vega", "rho")
+
+
+# Núcleo de precificação sem dependências de interface: apenas NumPy e a CDF normal
+# (scipy.special.ndtr, bem mais leve de importar que scipy.stats).
+
+_SQRT_2 = math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+_AS_P = 0.2316419
+_AS_B = (0.319381530, -0.356563782, 1.781477937, -1.821255978, 1.330274429)
+
+
+# N(x) pela função erro da biblioteca padrão (erfc evita cancelamento na cauda
+# esquerda); concorda com ndtr até o arredondamento (erro absoluto medido ~2.2e-16)
+def _erf_cdf(x):
+    return 0.5 * math.erfc(-x / _SQRT_2)
+
+
+# Aproximação racional 26.2.17 de Abramowitz & Stegun: erro absoluto máximo 7.5e-8
+def _abramowitz_stegun_cdf(x):
+    t = 1.0 / (1.0 + _AS_P * abs(x))
+    b1, b2, b3, b4, b5 = _AS_B
+    tail = math.exp(-0.5 * x * x) * _INV_SQRT_2PI * t * (b1 + t * (b2 + t * (b3 + t * (b4 + t * b5))))
+    return 1.0 - tail if x >= 0 else tail
+
+
+# CDFs do caminho escalar -> erro absoluto máximo documentado
+SCALAR_CDFS = {"erf": _erf_cdf, "abramowitz-stegun": _abramowitz_stegun_cdf}
+SCALAR_CDF_MAX_ERROR = {"erf": 2.3e-16, "abramowitz-stegun": 7.5e-8}
+
+# Configuração global do caminho escalar rápido (alterada por configure_scalar_path)
+_scalar_path = {"fast": True, "cdf": _erf_cdf}
+
+
+# Liga/desliga globalmente o caminho escalar rápido e escolhe a CDF usada por ele
+def configure_scalar_path(fast=None, cdf=None):
+    if fast is not None:
+        _scalar_path["fast"] = fast
+    if cdf is not None:
+        if cdf not in SCALAR_CDFS:
+            raise ValueError(f"cdf deve ser uma de {tuple(SCALAR_CDFS)}")
+        _scalar_path["cdf"] = SCALAR_CDFS[cdf]
+    return dict(_scalar_path, cdf=next(name for name, f in SCALAR_CDFS.items() if f is _scalar_path["cdf"]))
+
+
+# Mesmas fórmulas do kernel vetorizado só com o módulo math: para um único contrato,
+# o custo de converter entradas para arrays e despachar ufuncs é muito maior que a
+# aritmética em si
+def _scalar_price_and_greeks(S, K, T, r, sigma, option_type, cdf):
+    sign = 1.0 if option_type == "Call" else -1.0
+    sqrt_T = math.sqrt(T)
+    sigma_sqrt_T = sigma * sqrt_T
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+    discount = K * math.exp(-r * T)
+
+    cdf_d1 = cdf(sign * d1)
+    cdf_d2 = cdf(sign * d2)
+    pdf_d1 = math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+
+    return {
+        "price": sign * (S * cdf_d1 - discount * cdf_d2),
+        "delta": sign * cdf_d1,
+        "gamma": pdf_d1 / (S * sigma_sqrt_T),
+        "theta": -S * pdf_d1 * sigma / (2 * sqrt_T) - sign * r * discount * cdf_d2,
+        "vega": S * pdf_d1 * sqrt_T / 100,
+        "rho": sign * T * discount * cdf_d2 / 100,
+    }
+
+
+# Kernel vetorizado de Black-Scholes: recebe escalares ou arrays (com broadcasting)
+# para S, K, T, r, sigma e tipo de opção, calcula d1/d2, sqrt(T), exp(-rT), N(.) e
+# n(d1) uma única vez e devolve o preço e as cinco Gregas juntos.
+#
+# Com todos os parâmetros escalares (int/float e option_type str), usa o caminho
+# escalar rápido, a não ser que `fast=False` (por chamada) ou configure_scalar_path
+# (global) o desliguem. `cdf` escolhe a CDF do caminho escalar nesta chamada.
+# Entradas degeneradas (T = 0, sigma = 0, S/K <= 0, exp(-rT) fora do alcance do
+# float) caem no kernel vetorizado, que devolve inf/nan como antes.
+#
+# `dtype` (ex.: np.float32) fixa a precisão do kernel vetorizado: com float32 os
+# arrays intermediários e o resultado ocupam metade da memória.
+#
+# `sigma` também pode ser uma superfície de volatilidade (qualquer chamável
+# sigma(K, T), como VolSurface): a vol de cada contrato é lida nos seus K e T antes
+# do cálculo. Vega e as demais Gregas continuam sendo as de Black-Scholes nessa vol.
+def price_and_greeks(S, K, T, r, sigma, option_type="Call", fast=None, cdf=None, dtype=None):
+    if callable(sigma):
+        sigma = sigma(K, T)
+    if dtype is None and (_scalar_path["fast"] if fast is None else fast) and type(option_type) is str \
+            and all(isinstance(x, (int, float)) for x in (S, K, T, r, sigma)):
+        try:
+            return _scalar_price_and_greeks(S, K, T, r, sigma, option_type,
+                                            _scalar_path["cdf"] if cdf is None else SCALAR_CDFS[cdf])
+        except (ZeroDivisionError, ValueError, OverflowError):
+            pass
+    S, K, T, r, sigma = (np.asarray(x, dtype=float if dtype is None else dtype) for x in (S, K, T, r, sigma))
+    # +1 para Call, -1 para Put: as fórmulas da Put são as da Call com d1, d2 e o sinal trocados
+    sign = np.where(np.asarray(option_type) == "Call", 1.0, -1.0)
+    if dtype is not None:
+        sign = sign.astype(dtype)
+
+    sqrt_T = np.sqrt(T)
+    sigma_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+    discount = K * np.exp(-r * T)
+
+    cdf_d1 = ndtr(sign * d1)
+    cdf_d2 = ndtr(sign * d2)
+    pdf_d1 = np.exp(-0.5 * d1**2) * _INV_SQRT_2PI
+
+    result = {
+        "price": sign * (S * cdf_d1 - discount * cdf_d2),
+        "delta": sign * cdf_d1,
+        "gamma": pdf_d1 / (S * sigma_sqrt_T),
+        "theta": -S * pdf_d1 * sigma / (2 * sqrt_T) - sign * r * discount * cdf_d2,
+        "vega": S * pdf_d1 * sqrt_T / 100,  # por mudança de 1% na volatilidade
+        "rho": sign * T * discount * cdf_d2 / 100,  # por mudança de 1% na taxa de juros
+    }
+    # Entradas escalares devolvem escalares, como as funções calculate_* originais
+    return {name: value[()] if np.ndim(value) == 0 else value for name, value in result.items()}
+
+
+# Perda de precisão de um resultado compacto (ex.: float32) em relação à referência
+# float64: erro absoluto máximo e erro relativo máximo (sobre a maior magnitude da
+# referência) de cada array, junto com a memória de cada versão
+def precision_loss(reference, compact):
+    report = {}
+    for name, expected in reference.items():
+        expected = np.asarray(expected, dtype=np.float64)
+        actual = np.asarray(compact[name])
+        error = np.abs(actual.astype(np.float64) - expected)
+        scale = np.max(np.abs(expected)) if expected.size else 0.0
+        report[name] = {
+            "max_abs_error": float(np.max(error)) if error.size else 0.0,
+            "max_rel_error": float(np.max(error) / scale) if scale > 0 else 0.0,
+            "reference_bytes": expected.nbytes,
+            "compact_bytes": actual.nbytes,
+        }
+    return report
+
+
+# Funções escalares/vetoriais por Grega (wrappers finos sobre o kernel)
+def calculate_option_price(S, K, T, r, sigma, option_type, fast=None):
+    return price_and_greeks(S, K, T, r, sigma, option_type, fast)["price"]
+
+def calculate_delta(S, K, T, r, sigma, option_type, fast=None):
+    return price_and_greeks(S, K, T, r, sigma, option_type, fast)["delta"]
+
+def calculate_gamma(S, K, T, r, sigma, fast=None):
+    return price_and_greeks(S, K, T, r, sigma, fast=fast)["gamma"]
+
+def calculate_theta(S, K, T, r, sigma, option_type, fast=None):
+    return price_and_greeks(S, K, T, r, sigma, option_type, fast)["theta"]
+
+def calculate_vega(S, K, T, r, sigma, fast=None):
+    return price_and_greeks(S, K, T, r, sigma, fast=fast)["vega"]  # Vega é geralmente expresso por mudança de 1% na volatilidade
+
+def calculate_rho(S, K, T, r, sigma, option_type, fast=None):
+    return price_and_greeks(S, K, T, r, sigma, option_type, fast)["rho"]  # Rho é geralmente expresso por mudança de 1% na taxa de juros
@@ -0,0 +1,115 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .black_scholes import price_and_greeks
+
+
+# Cache LRU com limite de tamanho e TTL opcional, seguro para várias threads.
+# Uma instância no nível do módulo é compartilhada por todas as sessões do
+# servidor Streamlit, já que os módulos importados vivem no processo.
+class LRUCache:
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            self._evict()
+
+    def configure(self, maxsize=None, ttl=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._evict()
+
+    def _evict(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Decorador que memoriza uma função pelos seus argumentos (que devem ser hashable).
+# A chave vem dos argumentos ligados à assinatura com os padrões aplicados, então a
+# mesma chamada feita por posição, por nome ou omitindo um padrão usa uma só entrada.
+def lru_ttl_cache(maxsize=256, ttl=None):
+    def decorator(func):
+        cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+            found, value = cache.get(key)
+            if not found:
+                value = func(*args, **kwargs)
+                cache.put(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+# Curvas de preço e Gregas sobre uma grade de S, chaveadas pela especificação da
+# grade (S_min, S_max, n_points) e pelos parâmetros da opção. Todas as Gregas são
+# guardadas juntas, então trocar apenas a Grega exibida não recalcula nada. Os
+# arrays são somente leitura porque são compartilhados entre sessões. `dtype` é um
+# nome ("float64" ou "float32") para continuar servindo de chave do cache.
+@lru_ttl_cache(maxsize=512, ttl=3600)
+def pricing_grid(S_min, S_max, n_points, K, T, r, sigma, option_type, dtype="float64"):
+    S_range = np.linspace(S_min, S_max, n_points, dtype=dtype)
+    results = price_and_greeks(S_range, K, T, r, sigma, option_type, dtype=dtype)
+    return _readonly(S_range), {name: _readonly(values) for name, values in results.items()}
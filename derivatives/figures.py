@@ -0,0 +1,36 @@
+import sys
+
+
+# Figuras matplotlib reaproveitadas por sessão. As figuras são criadas com a API
+# orientada a objetos (matplotlib.figure.Figure), fora do registro global do pyplot,
+# então nada as mantém vivas além do próprio pool: a memória fica limitada a uma
+# figura por nome e sessão e é liberada quando a sessão termina.
+class FigurePool:
+    def __init__(self, figsize=None):
+        self.figsize = figsize
+        self.figures = {}
+        self.created = 0
+        self.reused = 0
+
+    # Devolve a figura `name` limpa, com um único eixo novo
+    def get(self, name):
+        fig = self.figures.get(name)
+        if fig is None:
+            from matplotlib.figure import Figure
+
+            fig = self.figures[name] = Figure(figsize=self.figsize)
+            self.created += 1
+        else:
+            fig.clear()
+            self.reused += 1
+        return fig, fig.add_subplot()
+
+    def __len__(self):
+        return len(self.figures)
+
+
+# Figuras abertas no registro global do pyplot (0 se o pyplot nem foi importado)
+def pyplot_figure_count():
+    if "matplotlib.pyplot" not in sys.modules:
+        return 0
+    return len(sys.modules["matplotlib.pyplot"].get_fignums())
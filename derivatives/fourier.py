@@ -0,0 +1,159 @@
+import time
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.integrate import quad_vec
+from scipy.stats import poisson
+
+from .black_scholes import price_and_greeks
+from .cache import lru_ttl_cache
+
+MODELS = ("black-scholes", "heston", "merton")
+
+# Parâmetros de cada modelo. Heston: variância inicial v0, velocidade de reversão
+# kappa, variância de longo prazo theta, vol da vol xi e correlação rho. Merton: vol
+# da parte difusiva sigma, intensidade dos saltos lam (saltos/ano) e média mu_j e
+# desvio delta_j do log do salto.
+DEFAULT_PARAMS = {
+    "black-scholes": {"sigma": 0.2},
+    "heston": {"v0": 0.04, "kappa": 2.0, "theta": 0.04, "xi": 0.5, "rho": -0.7},
+    "merton": {"sigma": 0.15, "lam": 0.5, "mu_j": -0.1, "delta_j": 0.15},
+}
+
+
+def _params(model, params):
+    if model not in MODELS:
+        raise ValueError(f"model deve ser um de {MODELS}")
+    return {**DEFAULT_PARAMS[model], **(params or {})}
+
+
+# Função característica de ln S_T sob a medida neutra ao risco, E[exp(i u ln S_T)],
+# para u complexo. No Heston usa a forma de Albrecher et al., sem a descontinuidade
+# do logaritmo complexo da forma original para prazos longos.
+def characteristic_function(u, S, T, r, model="black-scholes", params=None):
+    p = _params(model, params)
+    u = np.asarray(u, dtype=complex)
+    x0 = np.log(S)
+    if model == "black-scholes":
+        return np.exp(1j * u * (x0 + (r - 0.5 * p["sigma"]**2) * T) - 0.5 * p["sigma"]**2 * u**2 * T)
+    if model == "merton":
+        # kappa = E[e^J] - 1 corrige o drift para que S descontado seja martingal
+        kappa = np.exp(p["mu_j"] + 0.5 * p["delta_j"]**2) - 1
+        drift = r - 0.5 * p["sigma"]**2 - p["lam"] * kappa
+        jumps = np.exp(1j * u * p["mu_j"] - 0.5 * p["delta_j"]**2 * u**2) - 1
+        return np.exp(1j * u * (x0 + drift * T) - 0.5 * p["sigma"]**2 * u**2 * T + p["lam"] * T * jumps)
+    v0, kappa, theta, xi, rho = (p[name] for name in ("v0", "kappa", "theta", "xi", "rho"))
+    beta = kappa - rho * xi * 1j * u
+    d = np.sqrt(beta**2 + xi**2 * (1j * u + u**2))
+    g = (beta - d) / (beta + d)
+    decay = np.exp(-d * T)
+    C = kappa * theta / xi**2 * ((beta - d) * T - 2 * np.log((1 - g * decay) / (1 - g)))
+    D = (beta - d) / xi**2 * (1 - decay) / (1 - g * decay)
+    return np.exp(1j * u * (x0 + r * T) + C + D * v0)
+
+
+# Carr-Madan: o preço da call amortecido por exp(alpha k), como função do log-strike
+# k, tem transformada de Fourier em forma fechada a partir da função característica.
+# Uma única FFT de n pontos (regra de Simpson, espaçamento eta na frequência) devolve
+# as calls em n log-strikes igualmente espaçados (passo 2π/(n eta)), em O(n log n).
+def _carr_madan(S, T, r, model, params, n, eta, alpha):
+    v = eta * np.arange(n)
+    spacing = 2 * np.pi / (n * eta)
+    b = 0.5 * n * spacing
+    log_strikes = -b + spacing * np.arange(n) + np.log(S)  # grade centrada em ln S
+    psi = (np.exp(-r * T) * characteristic_function(v - (alpha + 1) * 1j, S, T, r, model, params)
+           / (alpha**2 + alpha - v**2 + 1j * (2 * alpha + 1) * v))
+    weights = eta / 3 * (3 + (-1) ** (np.arange(n) + 1))
+    weights[0] = eta / 3
+    calls = np.exp(-alpha * log_strikes) / np.pi * np.fft.fft(np.exp(-1j * v * log_strikes[0]) * psi * weights).real
+    return log_strikes, calls
+
+
+# Preços de uma grade inteira de strikes de uma vez, por FFT, em qualquer um dos
+# modelos. Os strikes pedidos são interpolados (spline cúbica em log-strike) na grade
+# da FFT; puts saem da paridade put-call. Sem `strikes`, devolve a grade de 50% a 150%
+# de S que a FFT produz.
+def fft_price(S, T, r, model="black-scholes", params=None, strikes=None, option_type="Call", n=4096, eta=0.25,
+              alpha=1.5):
+    log_strikes, calls = _carr_madan(S, T, r, model, params, n, eta, alpha)
+    if strikes is None:
+        inside = (log_strikes >= np.log(0.5 * S)) & (log_strikes <= np.log(1.5 * S))
+        strikes, prices = np.exp(log_strikes[inside]), calls[inside]
+    else:
+        strikes = np.asarray(strikes, dtype=float)
+        k = np.log(strikes)
+        if k.min() < log_strikes[1] or k.max() > log_strikes[-2]:
+            raise ValueError("strikes fora da grade da FFT; aumente n ou diminua eta")
+        # A spline só usa os nós em volta dos strikes pedidos
+        lo = max(np.searchsorted(log_strikes, k.min()) - 4, 0)
+        hi = min(np.searchsorted(log_strikes, k.max()) + 4, n)
+        prices = CubicSpline(log_strikes[lo:hi], calls[lo:hi])(k)
+    if option_type == "Put":
+        prices = prices - S + strikes * np.exp(-r * T)
+    return {"strikes": strikes, "price": prices}
+
+
+# Preço de referência sem FFT: fórmula fechada em Black-Scholes, série de Merton
+# (média de preços de Black-Scholes ponderada pela Poisson do número de saltos) e,
+# no Heston, as probabilidades P1 e P2 pela inversão de Gil-Pelaez com quadratura
+# adaptativa.
+def reference_price(S, T, r, model="black-scholes", params=None, strikes=100.0, option_type="Call"):
+    p = _params(model, params)
+    strikes = np.asarray(strikes, dtype=float)
+    if model == "black-scholes":
+        return price_and_greeks(S, strikes, T, r, p["sigma"], option_type)["price"]
+    if model == "merton":
+        kappa = np.exp(p["mu_j"] + 0.5 * p["delta_j"]**2) - 1
+        intensity = p["lam"] * (1 + kappa) * T
+        jumps = np.arange(int(poisson.isf(1e-14, intensity)) + 2)
+        weights = poisson.pmf(jumps, intensity)
+        sigma_n = np.sqrt(p["sigma"]**2 + jumps * p["delta_j"]**2 / T)
+        r_n = r - p["lam"] * kappa + jumps * np.log(1 + kappa) / T
+        terms = price_and_greeks(S, strikes[..., np.newaxis], T, r_n, sigma_n, option_type)["price"]
+        return np.sum(weights * terms, axis=-1)
+
+    k = np.log(strikes)
+    forward = S * np.exp(r * T)
+
+    def integrand(u):
+        phi = characteristic_function(np.array([u, u - 1j]), S, T, r, model, p)
+        kernel = np.exp(-1j * u * k) / (1j * u)
+        return np.stack([(kernel * phi[1] / forward).real, (kernel * phi[0]).real])
+
+    integrals, _ = quad_vec(integrand, 1e-8, np.inf, epsabs=1e-10)
+    P1, P2 = 0.5 + integrals / np.pi
+    calls = S * P1 - strikes * np.exp(-r * T) * P2
+    return calls if option_type == "Call" else calls - S + strikes * np.exp(-r * T)
+
+
+# Erro máximo da FFT contra a referência na grade de strikes e tempo de cada tamanho
+# de FFT, junto com o tempo da referência para a mesma grade
+def fft_convergence(S, T, r, model="black-scholes", params=None, strikes=None, option_type="Call",
+                    sizes=(256, 1024, 4096, 16384)):
+    strikes = np.linspace(0.6 * S, 1.4 * S, 200) if strikes is None else np.asarray(strikes, dtype=float)
+    start = time.perf_counter()
+    reference = reference_price(S, T, r, model, params, strikes, option_type)
+    reference_seconds = time.perf_counter() - start
+    report = []
+    for n in sizes:
+        start = time.perf_counter()
+        prices = fft_price(S, T, r, model, params, strikes, option_type, n=n)["price"]
+        elapsed = time.perf_counter() - start
+        report.append({
+            "model": model,
+            "n": n,
+            "strikes": len(strikes),
+            "max_error": float(np.max(np.abs(prices - reference))),
+            "milliseconds": elapsed * 1000,
+            "reference_milliseconds": reference_seconds * 1000,
+        })
+    return report
+
+
+# fft_convergence compartilhada entre sessões: no Heston a referência é uma
+# quadratura adaptativa, cara demais para refazer a cada interação da página.
+# `params` é uma tupla de pares (nome, valor) e `sizes` uma tupla, para servirem de
+# chave do cache; os strikes são a grade padrão de fft_convergence.
+@lru_ttl_cache(maxsize=128, ttl=3600)
+def fft_convergence_table(S, T, r, model="black-scholes", params=(), option_type="Call", sizes=(256, 1024, 4096, 16384)):
+    return fft_convergence(S, T, r, model, dict(params), None, option_type, sizes)
@@ -0,0 +1,40 @@
+import numpy as np
+
+# Número de bits 1 em cada valor de 16 bits (contagem de desvios para a direita)
+_POPCOUNT16 = np.array([bin(i).count("1") for i in range(2**16)], dtype=np.uint8)
+
+
+# Compartimento final de n_balls bolas em um Galton Board com n_levels níveis.
+# Cada bola usa n_levels bits aleatórios (1 = desvio para a direita), sorteados em
+# bloco como palavras de 16 bits; a posição é a contagem de bits 1, obtida por tabela.
+def galton_bins(n_levels, n_balls, rng=None):
+    if not 1 <= n_levels <= 255:
+        raise ValueError("n_levels deve estar entre 1 e 255")
+    rng = np.random.default_rng(rng)
+    n_words = -(-n_levels // 16)
+    raw = np.frombuffer(rng.bytes(2 * n_words * n_balls), dtype=np.uint16).reshape(n_words, n_balls)
+    bins = np.zeros(n_balls, dtype=np.uint8)
+    for w in range(n_words):
+        bits = min(16, n_levels - 16 * w)
+        word = raw[w] if bits == 16 else raw[w] & np.uint16((1 << bits) - 1)
+        bins += _POPCOUNT16[word]
+    return bins
+
+
+# Simula o Galton Board em lotes, devolvendo após cada lote o histograma acumulado
+# (contagem por compartimento, n_levels + 1 posições) e o total de bolas até ali
+def galton_histogram(n_levels, n_balls, batch_size=1_000_000, rng=None):
+    rng = np.random.default_rng(rng)
+    counts = np.zeros(n_levels + 1, dtype=np.int64)
+    dropped = 0
+    while dropped < n_balls:
+        n = min(batch_size, n_balls - dropped)
+        counts += np.bincount(galton_bins(n_levels, n, rng), minlength=n_levels + 1)
+        dropped += n
+        yield counts.copy(), dropped
+
+
+# Aproximação normal do histograma: média n/2 e variância n/4 da binomial
+def normal_approximation(n_levels, n_balls, x):
+    mean, std = n_levels / 2, np.sqrt(n_levels) / 2
+    return n_balls * np.exp(-0.5 * ((x - mean) / std) ** 2) / (std * np.sqrt(2 * np.pi))
@@ -0,0 +1,152 @@
+import functools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .black_scholes import price_and_greeks
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+# Gera um bloco de trajetórias de movimento browniano geométrico, todas de uma vez.
+# Devolve um array (n_paths, n_steps + 1) começando em S0. Se `normals` for dado
+# (n_paths, n_steps), ele é usado no lugar de novos sorteios (ex.: antitéticos).
+def gbm_paths(S0, r, sigma, T, n_steps, n_paths, rng=None, normals=None, dtype=np.float64):
+    if normals is None:
+        rng = np.random.default_rng(rng)
+        normals = rng.standard_normal((n_paths, n_steps), dtype=dtype)
+    dtype = normals.dtype
+    dt = T / n_steps
+    log_increments = (r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * normals
+    log_paths = np.concatenate([np.zeros((n_paths, 1), dtype=dtype), np.cumsum(log_increments, axis=1, dtype=dtype)], axis=1)
+    return (S0 * np.exp(log_paths)).astype(dtype, copy=False)
+
+
+# Acumulador de média e co-momentos de várias variáveis, combinado bloco a bloco
+# (algoritmo paralelo de Chan), então nunca é preciso guardar todas as amostras.
+class RunningMoments:
+    def __init__(self, n_vars):
+        self.n = 0
+        self.mean = np.zeros(n_vars)
+        self.m2 = np.zeros((n_vars, n_vars))
+
+    def merge(self, n_b, mean_b, m2_b):
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.m2 = self.m2 + m2_b + np.outer(delta, delta) * (self.n * n_b / n)
+        self.mean = self.mean + delta * (n_b / n)
+        self.n = n
+
+    def covariance(self):
+        return self.m2 / (self.n - 1)
+
+
+def _chunk_samples(S, K, T, r, sigma, option_type, n_samples, n_steps, antithetic, rng, dtype=np.float64):
+    discount = np.exp(-r * T)
+    sign = 1.0 if option_type == "Call" else -1.0
+    normals = rng.standard_normal((n_samples, n_steps), dtype=dtype)
+    draws = [normals, -normals] if antithetic else [normals]
+    payoffs, terminals = [], []
+    for z in draws:
+        S_T = gbm_paths(S, r, sigma, T, n_steps, n_samples, normals=z)[:, -1]
+        payoffs.append(discount * np.maximum(sign * (S_T - K), 0.0))
+        terminals.append(discount * S_T)
+    # Com antitéticos a unidade amostral é o par (Z, -Z), o que mantém o erro padrão correto
+    payoff = np.mean(payoffs, axis=0)
+    terminal = np.mean(terminals, axis=0)
+    return np.column_stack([payoff, terminal])
+
+
+def _estimate(moments, S, control_variate):
+    n = moments.n
+    cov = moments.covariance() if n > 1 else np.zeros((2, 2))
+    if control_variate and cov[1, 1] > 0:
+        # Controle: valor descontado de S_T, cuja esperança exata é S0
+        beta = cov[0, 1] / cov[1, 1]
+        estimate = moments.mean[0] - beta * (moments.mean[1] - S)
+        variance = cov[0, 0] - cov[0, 1] ** 2 / cov[1, 1]
+    else:
+        estimate = moments.mean[0]
+        variance = cov[0, 0]
+    return estimate, np.sqrt(max(variance, 0.0) / n)
+
+
+# Semente de cada bloco derivada de uma única SeedSequence: o bloco i sempre usa
+# o mesmo fluxo aleatório, independentemente de como os blocos são agendados.
+def chunk_seeds(seed, n_paths, chunk_size, antithetic=False):
+    per_sample = 2 if antithetic else 1
+    n_samples = -(-n_paths // per_sample)
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    return sizes, np.random.SeedSequence(seed).spawn(len(sizes))
+
+
+# Os momentos do bloco são sempre acumulados em float64, mesmo com trajetórias em float32
+def run_chunk(S, K, T, r, sigma, option_type, n_samples, seed_seq, n_steps=1, antithetic=False, dtype=np.float64):
+    rng = np.random.default_rng(seed_seq)
+    samples = _chunk_samples(S, K, T, r, sigma, option_type, n_samples, n_steps, antithetic, rng, dtype)
+    mean = samples.mean(axis=0, dtype=np.float64)
+    centered = samples - mean
+    return n_samples, mean, centered.T @ centered
+
+
+# Preço de uma opção europeia por Monte Carlo. As trajetórias são geradas em blocos
+# vetorizados de `chunk_size` amostras e descartadas após atualizar o acumulador, então
+# a memória depende só do tamanho do bloco (e de n_steps), não de n_paths.
+# Com n_workers > 1 os blocos são simulados em um pool de processos. Como cada bloco
+# tem sua própria semente e os resultados são combinados na ordem dos blocos, o
+# resultado é idêntico bit a bit para qualquer número de workers.
+# `dtype=np.float32` gera as trajetórias em float32 (metade da memória por bloco).
+# Devolve preço, erro padrão e o traço de convergência (trajetórias, preço, erro padrão)
+# após cada bloco, junto com o preço fechado de Black-Scholes para comparação.
+def monte_carlo_price(S, K, T, r, sigma, option_type="Call", n_paths=1_000_000,
+                      chunk_size=DEFAULT_CHUNK_SIZE, n_steps=1, antithetic=False,
+                      control_variate=False, seed=None, n_workers=1, dtype=np.float64):
+    start = time.perf_counter()
+    sizes, seeds = chunk_seeds(seed, n_paths, chunk_size, antithetic)
+    simulate = functools.partial(run_chunk, S, K, T, r, sigma, option_type,
+                                 n_steps=n_steps, antithetic=antithetic, dtype=dtype)
+
+    moments = RunningMoments(2)
+    trace = []
+
+    def accumulate(chunks):
+        for chunk in chunks:
+            moments.merge(*chunk)
+            trace.append((moments.n, *_estimate(moments, S, control_variate)))
+
+    if n_workers > 1:
+        # "spawn" evita fork de um processo com várias threads (ex.: o servidor Streamlit)
+        with ProcessPoolExecutor(n_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            accumulate(pool.map(simulate, sizes, seeds, chunksize=max(1, len(sizes) // (4 * n_workers))))
+    else:
+        accumulate(map(simulate, sizes, seeds))
+
+    price, stderr = trace[-1][1:]
+    closed_form = price_and_greeks(S, K, T, r, sigma, option_type)["price"]
+    return {
+        "price": price,
+        "stderr": stderr,
+        "n_paths": moments.n * (2 if antithetic else 1),
+        "closed_form": closed_form,
+        "trace": np.array(trace),
+        "n_workers": n_workers,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+# Roda o mesmo preço com 1 e com n_workers processos e compara tempo e resultado
+def measure_speedup(S, K, T, r, sigma, option_type="Call", n_workers=None, seed=0, **kwargs):
+    n_workers = n_workers or multiprocessing.cpu_count()
+    single = monte_carlo_price(S, K, T, r, sigma, option_type, seed=seed, n_workers=1, **kwargs)
+    multi = monte_carlo_price(S, K, T, r, sigma, option_type, seed=seed, n_workers=n_workers, **kwargs)
+    return {
+        "n_workers": n_workers,
+        "single_core_seconds": single["elapsed"],
+        "multi_core_seconds": multi["elapsed"],
+        "speedup": single["elapsed"] / multi["elapsed"],
+        "identical": bool(single["price"] == multi["price"] and single["stderr"] == multi["stderr"]),
+        "price": multi["price"],
+        "stderr": multi["stderr"],
+    }
@@ -0,0 +1,177 @@
+import math
+import time
+
+import numpy as np
+
+
+# Livro de ofertas com quantidades agregadas por nível de preço, guardadas em
+# listas compactas indexadas pelo preço em ticks (nível i = preço base + i * tick).
+# Agentes de inteligência zero enviam ordens limitadas, ordens a mercado e
+# cancelamentos; a `forca` (-1 a 1) desloca a probabilidade de cada ordem ser de
+# compra, então compradores mais fortes levam o preço para cima.
+class OrderBook:
+    def __init__(self, initial_price=100.0, tick=0.01, n_levels=10_000, initial_depth=50,
+                 p_limit=0.5, p_market=0.05, mean_offset=10, max_market_size=5, seed=None):
+        if initial_price <= tick:
+            raise ValueError("initial_price deve ser maior que um tick")
+        self.tick = tick
+        self.n_levels = n_levels
+        # O preço inicial fica no meio da grade ou, se for baixo demais para caber meia
+        # grade abaixo dele, mais perto do início: o nível 0 vale ao menos um tick
+        center = min(n_levels // 2, self._ticks(initial_price) - 1)
+        self.base_price = initial_price - center * tick
+        self.p_limit = p_limit
+        self.p_market = p_market
+        self.mean_offset = mean_offset
+        self.max_market_size = max_market_size
+        self.rng = np.random.default_rng(seed)
+
+        self.bids = [0] * n_levels
+        self.asks = [0] * n_levels
+        for k in range(1, initial_depth + 1):
+            if center - k >= 0:
+                self.bids[center - k] = 1
+            self.asks[center + k] = 1
+        self.best_bid = center - 1
+        self.best_ask = center + 1
+        self.events = 0
+        self.elapsed = 0.0
+
+    # Quantos ticks inteiros cabem em `price` (com folga para o arredondamento de float)
+    def _ticks(self, price):
+        return math.floor(price / self.tick + 1e-9)
+
+    def price(self, level):
+        return self.base_price + level * self.tick
+
+    # Nível médio entre os melhores preços; com um lado vazio, usa o outro
+    def _mid_level(self):
+        has_bid, has_ask = self.best_bid >= 0, self.best_ask < self.n_levels
+        if has_bid and has_ask:
+            return 0.5 * (self.best_bid + self.best_ask)
+        if has_bid or has_ask:
+            return self.best_bid if has_bid else self.best_ask
+        return self.n_levels // 2
+
+    def mid_price(self):
+        return self.price(self._mid_level())
+
+    def spread(self):
+        if self.best_bid < 0 or self.best_ask >= self.n_levels:
+            return np.nan
+        return (self.best_ask - self.best_bid) * self.tick
+
+    # Desloca a grade de preços para manter o preço médio no centro; níveis que saem
+    # da grade (ordens muito longe do preço) são descartados. O nível 0 nunca fica
+    # abaixo de um tick, então o preço não se torna negativo.
+    def _recenter(self):
+        shift = int(self._mid_level()) - self.n_levels // 2
+        shift = max(shift, 1 - self._ticks(self.base_price))
+        if shift == 0:
+            return
+        for side in (self.bids, self.asks):
+            if shift > 0:
+                side[:] = side[shift:] + [0] * shift
+            else:
+                side[:] = [0] * -shift + side[:shift]
+        self.base_price += shift * self.tick
+        if self.best_bid >= 0:
+            self.best_bid = self.best_bid - shift if self.best_bid >= shift else -1
+        if self.best_ask < self.n_levels:
+            self.best_ask = self.best_ask - shift if self.best_ask - shift < self.n_levels else self.n_levels
+
+    # Quantidade total a até `window` ticks do melhor preço de cada lado
+    def depth(self, window=100):
+        bid_depth = sum(self.bids[max(self.best_bid - window, 0):self.best_bid + 1]) if self.best_bid >= 0 else 0
+        ask_depth = sum(self.asks[self.best_ask:self.best_ask + window + 1]) if self.best_ask < self.n_levels else 0
+        return bid_depth, ask_depth
+
+    # Processa n_events eventos e registra preço médio, spread e profundidade a cada
+    # `record_every` eventos. Os sorteios são feitos em bloco com NumPy e o laço de
+    # casamento usa apenas inteiros Python sobre listas, que é o que o mantém rápido.
+    def simulate(self, n_events, forca=0.0, record_every=100, depth_window=100):
+        start = time.perf_counter()
+        rng = self.rng
+        kinds = rng.random(n_events)
+        # A força só desloca as ordens a mercado (agressão); ordens limitadas e
+        # cancelamentos continuam equilibrados entre os dois lados
+        p_buy = np.where(kinds < self.p_limit, 0.5, np.where(kinds < self.p_limit + self.p_market, 0.5 * (1.0 + forca), 0.5))
+        buys = (rng.random(n_events) < p_buy).tolist()
+        kinds = kinds.tolist()
+        offsets = rng.geometric(1.0 / self.mean_offset, n_events).tolist()
+        sizes = rng.integers(1, self.max_market_size + 1, n_events).tolist()
+
+        bids, asks, n_levels = self.bids, self.asks, self.n_levels
+        best_bid, best_ask = self.best_bid, self.best_ask
+        p_limit, p_market_cum = self.p_limit, self.p_limit + self.p_market
+        records = []
+        margin = n_levels // 4
+        center = n_levels // 2
+
+        for i in range(n_events):
+            kind, buy, offset = kinds[i], buys[i], offsets[i]
+            if kind < p_limit:
+                # Ordem limitada a `offset` ticks do melhor preço do lado oposto
+                if buy:
+                    reference = best_ask if best_ask < n_levels else (best_bid + 1 if best_bid >= 0 else center)
+                    level = reference - offset
+                    if level >= 0:
+                        bids[level] += 1
+                        if level > best_bid:
+                            best_bid = level
+                else:
+                    reference = best_bid if best_bid >= 0 else (best_ask - 1 if best_ask < n_levels else center)
+                    level = reference + offset
+                    if level < n_levels:
+                        asks[level] += 1
+                        if level < best_ask:
+                            best_ask = level
+            elif kind < p_market_cum:
+                # Ordem a mercado consome os melhores níveis do lado oposto
+                remaining = sizes[i]
+                if buy:
+                    while remaining and best_ask < n_levels:
+                        filled = min(remaining, asks[best_ask])
+                        asks[best_ask] -= filled
+                        remaining -= filled
+                        while best_ask < n_levels and asks[best_ask] == 0:
+                            best_ask += 1
+                else:
+                    while remaining and best_bid >= 0:
+                        filled = min(remaining, bids[best_bid])
+                        bids[best_bid] -= filled
+                        remaining -= filled
+                        while best_bid >= 0 and bids[best_bid] == 0:
+                            best_bid -= 1
+            else:
+                # Cancelamento de uma unidade a `offset - 1` ticks do melhor preço do próprio lado
+                if buy:
+                    level = best_bid - offset + 1
+                    if level >= 0 and bids[level]:
+                        bids[level] -= 1
+                        while best_bid >= 0 and bids[best_bid] == 0:
+                            best_bid -= 1
+                else:
+                    level = best_ask + offset - 1
+                    if level < n_levels and asks[level]:
+                        asks[level] -= 1
+                        while best_ask < n_levels and asks[best_ask] == 0:
+                            best_ask += 1
+
+            if (i + 1) % record_every == 0:
+                self.best_bid, self.best_ask = best_bid, best_ask
+                records.append((self.events + i + 1, self.mid_price(), self.spread(), *self.depth(depth_window)))
+                if min(best_bid, n_levels - 1 - best_ask) < margin:
+                    self._recenter()
+                    best_bid, best_ask = self.best_bid, self.best_ask
+
+        self.best_bid, self.best_ask = best_bid, best_ask
+        self.events += n_events
+        self.elapsed += time.perf_counter() - start
+
+        columns = np.array(records, dtype=float).reshape(-1, 5).T
+        return dict(zip(["event", "mid_price", "spread", "bid_depth", "ask_depth"], columns))
+
+    # Vazão média desde a criação do livro
+    def events_per_second(self):
+        return self.events / self.elapsed if self.elapsed else 0.0
@@ -0,0 +1,150 @@
+import time
+
+import numpy as np
+from scipy.sparse import diags, identity
+from scipy.sparse.linalg import splu
+
+from .black_scholes import price_and_greeks
+from .cache import _readonly, lru_ttl_cache
+from .surfaces import downsample_surface
+
+# Esquema -> peso θ da parte implícita (0 explícito, 1 implícito, 1/2 Crank-Nicolson)
+SCHEMES = {"explicit": 0.0, "implicit": 1.0, "crank-nicolson": 0.5}
+BARRIERS = ("up-and-out", "down-and-out")
+
+
+# Diferenças finitas para a EDP de Black-Scholes em uma grade (S, t), resolvida do
+# vencimento para hoje pelo método θ. Os coeficientes não dependem do tempo, então a
+# matriz tridiagonal (I - θ dt L) é fatorada (LU esparsa) uma única vez e cada passo
+# só faz as substituições. Com barreira knock-out, a grade termina na barreira, onde a
+# opção vale zero. Exercício americano é imposto projetando o valor sobre o payoff
+# depois de cada passo.
+#
+# Sem n_time, usa n_space passos nos esquemas implícitos e o mínimo estável no explícito.
+# Devolve a grade inteira (values[n] = valores no tempo t_grid[n], n = 0 é hoje) e
+# preço, Delta, Gamma e Theta em S interpolados da grade, sem reprecificar. S pode ser
+# um array de preços do ativo.
+def fd_price(S, K, T, r, sigma, option_type="Call", scheme="crank-nicolson", n_space=400, n_time=None,
+             S_max=None, american=False, barrier=None, barrier_type="up-and-out", rannacher_steps=2):
+    if scheme not in SCHEMES:
+        raise ValueError(f"scheme deve ser um de {tuple(SCHEMES)}")
+    if barrier is not None and barrier_type not in BARRIERS:
+        raise ValueError(f"barrier_type deve ser um de {BARRIERS}")
+    theta = SCHEMES[scheme]
+    sign = 1.0 if option_type == "Call" else -1.0
+
+    S_min = 0.0
+    if S_max is None:
+        S_max = 4.0 * max(K, float(np.max(S)))
+    if barrier is not None:
+        if barrier_type == "up-and-out":
+            S_max = barrier
+        else:
+            S_min = barrier
+    S_grid = np.linspace(S_min, S_max, n_space + 1)
+    dS = S_grid[1] - S_grid[0]
+
+    # Operador L V_i = a_i V_{i-1} + b_i V_i + c_i V_{i+1} nos nós interiores
+    interior = S_grid[1:-1]
+    diffusion = 0.5 * sigma**2 * interior**2 / dS**2
+    drift = 0.5 * r * interior / dS
+    a, b, c = diffusion - drift, -2 * diffusion - r, diffusion + drift
+    # O explícito só é estável com dt * max(2 a_i + r) <= 1
+    stable_steps = int(np.ceil(T * np.max(2 * diffusion + r)))
+    if n_time is None:
+        n_time = stable_steps if theta == 0.0 else n_space
+    elif theta == 0.0 and n_time < stable_steps:
+        raise ValueError(f"esquema explícito instável com n_time={n_time}; use n_time >= {stable_steps}")
+    dt = T / n_time
+    L = diags([a[1:], b, c[:-1]], [-1, 0, 1], format="csc")
+    eye = identity(len(interior), format="csc")
+
+    def factor(weight):
+        return splu((eye - weight * dt * L).tocsc()) if weight > 0 else None
+
+    # Crank-Nicolson oscila perto do strike (payoff não suave); os primeiros passos
+    # implícitos (suavização de Rannacher) amortecem isso, com uma segunda fatoração
+    solvers = {theta: factor(theta)}
+    if theta == 0.5 and rannacher_steps:
+        solvers[1.0] = factor(1.0)
+
+    payoff = np.maximum(sign * (S_grid - K), 0.0)
+
+    def boundaries(tau):
+        lower = upper = 0.0
+        if barrier is None or barrier_type == "up-and-out":
+            lower = K * np.exp(-r * tau) if sign < 0 else 0.0
+            if american and sign < 0:
+                lower = K
+        if barrier is None or barrier_type == "down-and-out":
+            upper = S_max - K * np.exp(-r * tau) if sign > 0 else 0.0
+        return lower, upper
+
+    values = np.empty((n_time + 1, n_space + 1))
+    values[n_time] = payoff
+    if barrier is not None:
+        values[n_time, -1 if barrier_type == "up-and-out" else 0] = 0.0
+    for n in range(n_time - 1, -1, -1):
+        tau_old, tau_new = T - (n + 1) * dt, T - n * dt
+        weight = 1.0 if theta == 0.5 and n >= n_time - rannacher_steps else theta
+        old = values[n + 1]
+        (lower_old, upper_old), (lower_new, upper_new) = boundaries(tau_old), boundaries(tau_new)
+
+        rhs = old[1:-1] + (1 - weight) * dt * (L @ old[1:-1])
+        rhs[0] += dt * a[0] * ((1 - weight) * lower_old + weight * lower_new)
+        rhs[-1] += dt * c[-1] * ((1 - weight) * upper_old + weight * upper_new)
+        new = values[n]
+        new[1:-1] = solvers[weight].solve(rhs) if weight > 0 else rhs
+        new[0], new[-1] = lower_new, upper_new
+        if american:
+            np.maximum(new, payoff, out=new)
+
+    today = values[0]
+    delta_grid = np.gradient(today, dS)
+    gamma_grid = np.gradient(delta_grid, dS)
+    theta_grid = (values[1] - values[0]) / dt
+    S = np.asarray(S, dtype=float)
+    result = {
+        "price": np.interp(S, S_grid, today),
+        "delta": np.interp(S, S_grid, delta_grid),
+        "gamma": np.interp(S, S_grid, gamma_grid),
+        "theta": np.interp(S, S_grid, theta_grid),
+    }
+    result = {name: value[()] if np.ndim(value) == 0 else value for name, value in result.items()}
+    result.update(S_grid=S_grid, t_grid=np.linspace(0.0, T, n_time + 1), values=values)
+    return result
+
+
+# fd_price compartilhado entre sessões, com a grade (S, t) já reduzida a no máximo
+# max_points por eixo: a grade completa do explícito chega a dezenas de MB, e a
+# página só exibe a versão reduzida. n_time é o número de passos de tempo resolvidos.
+@lru_ttl_cache(maxsize=64, ttl=3600)
+def fd_price_summary(S, K, T, r, sigma, option_type="Call", scheme="crank-nicolson", n_space=400, american=False,
+                     barrier=None, barrier_type="up-and-out", max_points=100):
+    result = fd_price(S, K, T, r, sigma, option_type, scheme, n_space, american=american, barrier=barrier,
+                      barrier_type=barrier_type)
+    S_grid, t_grid, values = downsample_surface(result["S_grid"], result["t_grid"], result["values"], max_points)
+    return dict(result, S_grid=_readonly(S_grid), t_grid=_readonly(t_grid), values=_readonly(values),
+                n_time=len(result["t_grid"]) - 1)
+
+
+# Erro em relação à fórmula fechada (opção europeia sem barreira) e tempo de cada
+# esquema por tamanho de grade (com o n_time padrão de cada esquema)
+def fd_convergence(S, K, T, r, sigma, option_type="Call", sizes=(50, 100, 200, 400, 800), schemes=tuple(SCHEMES)):
+    reference = price_and_greeks(S, K, T, r, sigma, option_type)
+    report = []
+    for scheme in schemes:
+        for n_space in sizes:
+            start = time.perf_counter()
+            result = fd_price(S, K, T, r, sigma, option_type, scheme, n_space)
+            elapsed = time.perf_counter() - start
+            report.append({
+                "scheme": scheme,
+                "n_space": n_space,
+                "n_time": len(result["t_grid"]) - 1,
+                "price_error": float(abs(result["price"] - reference["price"])),
+                "delta_error": float(abs(result["delta"] - reference["delta"])),
+                "gamma_error": float(abs(result["gamma"] - reference["gamma"])),
+                "milliseconds": elapsed * 1000,
+            })
+    return report
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+_log_lock = threading.Lock()
+
+
+# Memória residente atual do processo em bytes (pico, via getrusage, fora do Linux)
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+# Cronômetro de uma execução (rerun) de página. Cada `mark(stage)` atribui ao
+# estágio o tempo decorrido desde a marca anterior; estágios repetidos acumulam.
+class RerunProfiler:
+    def __init__(self, page=None, session_id=None):
+        self.page = page
+        self.session_id = session_id
+        self.timestamp = time.time()
+        self.started = self._last = time.perf_counter()
+        self.stages = {}
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    # Fecha a medição; o tempo desde a última marca vai para "other". A memória
+    # residente no fim da execução vai junto, para acompanhar crescimento sob carga.
+    def finish(self):
+        self.mark("other")
+        return {
+            "timestamp": self.timestamp,
+            "session": self.session_id,
+            "page": self.page,
+            "total": self._last - self.started,
+            "stages": dict(self.stages),
+            "rss": rss_bytes(),
+        }
+
+
+def to_jsonl(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+# Acrescenta registros a um arquivo JSON lines compartilhado pelas sessões do processo
+def append_jsonl(path, records):
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(to_jsonl(records))
+
+
+def read_jsonl(paths):
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+# p50/p95 do tempo total e de cada estágio, por página
+def summarize(records):
+    by_page = {}
+    for record in records:
+        by_page.setdefault(record["page"], []).append(record)
+    summary = {}
+    for page, page_records in by_page.items():
+        totals = [record["total"] for record in page_records]
+        stages = sorted({stage for record in page_records for stage in record["stages"]})
+        summary[page] = {
+            "reruns": len(page_records),
+            "p50": float(np.percentile(totals, 50)),
+            "p95": float(np.percentile(totals, 95)),
+            "stages": {
+                stage: {
+                    "p50": float(np.percentile([r["stages"].get(stage, 0.0) for r in page_records], 50)),
+                    "p95": float(np.percentile([r["stages"].get(stage, 0.0) for r in page_records], 95)),
+                }
+                for stage in stages
+            },
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrega latências de rerun (JSON lines) em p50/p95 por página.")
+    parser.add_argument("paths", nargs="+", help="arquivos JSON lines exportados pelo app")
+    args = parser.parse_args(argv)
+    json.dump(summarize(read_jsonl(args.paths)), sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import collections
+import json
+import math
+import time
+
+import numpy as np
+
+from .black_scholes import GREEKS, price_and_greeks
+
+INPUT_FIELDS = ("S", "K", "T", "r", "sigma")
+OUTPUT_FIELDS = ("price",) + GREEKS
+
+# Serviço HTTP/JSON local de precificação, só com asyncio (sem framework web).
+# Requisições concorrentes entram em uma fila; o batcher espera até `window`
+# segundos a partir do primeiro contrato (ou até `max_batch` contratos) e precifica
+# o lote inteiro com uma única chamada de price_and_greeks.
+#
+#   POST /price   {"S": 100, "K": 100, "T": 1, "r": 0.05, "sigma": 0.2, "option_type": "Call"}
+#                 ou uma lista desses objetos; a resposta tem o mesmo formato. Um
+#                 contrato cujo preço ou Gregas não são finitos (ex.: r = -1000)
+#                 vira {"error": ...}: 422 sozinho, ou uma entrada de erro na lista
+#   GET  /stats   contadores de requisições, lotes, vazão e latência (p50/p95/p99)
+
+
+class MicroBatcher:
+    def __init__(self, window=0.002, max_batch=4096, latency_window=10_000):
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.started = time.perf_counter()
+        self.contracts = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.latencies = collections.deque(maxlen=latency_window)
+
+    # Enfileira um contrato já validado e espera o resultado do lote
+    async def submit(self, contract):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((contract, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # O que já estiver na fila entra no lote sem esperar mais
+        while len(batch) < self.max_batch and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def run(self):
+        while True:
+            batch = await self._collect()
+            contracts = [item[0] for item in batch]
+            # Overflow/NaN de parâmetros extremos são tratados abaixo, contrato a contrato
+            with np.errstate(all="ignore"):
+                values = price_and_greeks(
+                    *(np.array([contract[field] for contract in contracts]) for field in INPUT_FIELDS),
+                    np.array([contract["option_type"] for contract in contracts]),
+                )
+            columns = {name: np.atleast_1d(values[name]).tolist() for name in OUTPUT_FIELDS}
+            finite = np.logical_and.reduce([np.isfinite(np.atleast_1d(values[name])) for name in OUTPUT_FIELDS])
+            done = time.perf_counter()
+            for i, (_, future, enqueued) in enumerate(batch):
+                if not future.cancelled():
+                    # NaN/inf não são JSON válido: o contrato sai como erro
+                    future.set_result({name: columns[name][i] for name in OUTPUT_FIELDS} if finite[i]
+                                      else {"error": "preço ou Gregas não finitos para estes parâmetros"})
+                self.latencies.append(done - enqueued)
+            self.contracts += len(batch)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.array([np.nan])
+        return {
+            "window_ms": self.window * 1000,
+            "uptime_seconds": elapsed,
+            "contracts": self.contracts,
+            "batches": self.batches,
+            "mean_batch": self.contracts / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "contracts_per_second": self.contracts / elapsed,
+            "latency_ms": dict(zip(("p50", "p95", "p99"), np.percentile(latencies, [50, 95, 99]).tolist())),
+        }
+
+
+# Valida e normaliza um contrato do corpo JSON
+def parse_contract(item):
+    if not isinstance(item, dict):
+        raise ValueError("cada contrato deve ser um objeto JSON")
+    # bool é subclasse de int: float(True) daria 1.0
+    if any(isinstance(item.get(field), bool) for field in INPUT_FIELDS):
+        raise ValueError(f"os campos {', '.join(INPUT_FIELDS)} devem ser numéricos")
+    try:
+        contract = {field: float(item[field]) for field in INPUT_FIELDS}
+    except KeyError as missing:
+        raise ValueError(f"campo ausente: {missing.args[0]}") from None
+    except (TypeError, ValueError):
+        raise ValueError(f"os campos {', '.join(INPUT_FIELDS)} devem ser numéricos") from None
+    # float() aceita "nan" e "inf", que passariam pelas comparações abaixo e sairiam
+    # na resposta como NaN/Infinity, que não são JSON válido
+    non_finite = [field for field in INPUT_FIELDS if not math.isfinite(contract[field])]
+    if non_finite:
+        raise ValueError(f"os campos {', '.join(non_finite)} devem ser finitos")
+    contract["option_type"] = item.get("option_type", "Call")
+    if contract["option_type"] not in ("Call", "Put"):
+        raise ValueError("option_type deve ser 'Call' ou 'Put'")
+    if min(contract["S"], contract["K"], contract["T"], contract["sigma"]) <= 0:
+        raise ValueError("S, K, T e sigma devem ser positivos")
+    return contract
+
+
+class PricingService:
+    def __init__(self, window=0.002, max_batch=4096):
+        self.batcher = MicroBatcher(window, max_batch)
+        self.requests = 0
+        self.errors = 0
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/stats":
+            return 200, dict(self.batcher.stats(), requests=self.requests, errors=self.errors)
+        if method == "POST" and path == "/price":
+            try:
+                payload = json.loads(body)
+                items = payload if isinstance(payload, list) else [payload]
+                contracts = [parse_contract(item) for item in items]
+            except ValueError as error:  # inclui json.JSONDecodeError
+                return 400, {"error": str(error)}
+            results = await asyncio.gather(*(self.batcher.submit(contract) for contract in contracts))
+            if isinstance(payload, list):
+                return 200, results
+            return (422 if "error" in results[0] else 200), results[0]
+        return 404, {"error": f"rota desconhecida: {method} {path}"}
+
+    # Uma conexão HTTP/1.1 com keep-alive: lê requisições até o cliente fechar
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.requests += 1
+                status, response = await self._route(method, path, body)
+                if status != 200:
+                    self.errors += 1
+                try:
+                    data = json.dumps(response, allow_nan=False).encode()
+                except ValueError:
+                    status, data = 500, json.dumps({"error": "resposta com valores não finitos"}).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, ready=None):
+        server = await asyncio.start_server(self.handle, host, port)
+        batcher = asyncio.create_task(self.batcher.run())
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON local de preço e Gregas de Black-Scholes com micro-lotes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="porta (0 escolhe uma livre)")
+    parser.add_argument("--window", type=float, default=2.0, help="janela do micro-lote em milissegundos")
+    parser.add_argument("--max-batch", type=int, default=4096, help="contratos por lote, no máximo")
+    args = parser.parse_args(argv)
+
+    service = PricingService(args.window / 1000, args.max_batch)
+
+    def ready(port):
+        print(json.dumps({"host": args.host, "port": port, "window_ms": args.window}), flush=True)
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
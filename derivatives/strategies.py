@@ -0,0 +1,172 @@
+import time
+
+import numpy as np
+
+from .black_scholes import GREEKS, price_and_greeks
+
+
+# Estratégia (ou carteira) de opções europeias guardada em colunas: cada perna é uma
+# posição nos arrays `quantity` (positiva = comprada, negativa = vendida), `is_call`,
+# `strike`, `expiry` (anos a partir de hoje) e `premium` (preço pago/recebido por
+# unidade). Payoff, preço e Gregas líquidas saem de uma única passada vetorizada sobre
+# todas as pernas, então a mesma classe serve para uma trava de duas pernas e para um
+# livro de 10^5 pernas.
+class Strategy:
+    def __init__(self, quantity=(), is_call=(), strike=(), expiry=(), premium=None):
+        self.quantity = np.asarray(quantity, dtype=float).ravel()
+        n = len(self.quantity)
+        self.is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), (n,)).copy()
+        self.strike = np.broadcast_to(np.asarray(strike, dtype=float), (n,)).copy()
+        self.expiry = np.broadcast_to(np.asarray(expiry, dtype=float), (n,)).copy()
+        self.premium = np.zeros(n) if premium is None else np.broadcast_to(np.asarray(premium, dtype=float), (n,)).copy()
+
+    def __len__(self):
+        return len(self.quantity)
+
+    # Acrescenta pernas (escalares ou arrays); para livros grandes prefira montar as
+    # colunas de uma vez no construtor
+    def add_leg(self, option_type, strike, expiry, quantity=1.0, premium=0.0):
+        quantity, is_call, strike, expiry, premium = np.broadcast_arrays(
+            np.atleast_1d(quantity), np.asarray(option_type) == "Call", strike, expiry, premium)
+        leg = Strategy(quantity, is_call, strike, expiry, premium)
+        self.quantity = np.concatenate([self.quantity, leg.quantity])
+        self.is_call = np.concatenate([self.is_call, leg.is_call])
+        self.strike = np.concatenate([self.strike, leg.strike])
+        self.expiry = np.concatenate([self.expiry, leg.expiry])
+        self.premium = np.concatenate([self.premium, leg.premium])
+        return self
+
+    def option_types(self):
+        return np.where(self.is_call, "Call", "Put")
+
+    # Custo líquido de montagem: positivo quando a estratégia é paga, negativo quando recebe prêmio
+    def cost(self):
+        return float(np.dot(self.quantity, self.premium))
+
+    # Marca o prêmio de cada perna pelo preço de Black-Scholes em t=0
+    def mark_premiums(self, S, r, sigma):
+        self.premium = np.asarray(price_and_greeks(S, self.strike, self.expiry, r, sigma, self.option_types())["price"], dtype=float)
+        return self
+
+    # Payoff agregado no vencimento para um array de preços S_T. Em vez de montar a
+    # matriz (preços x pernas), ordena os strikes e usa somas acumuladas:
+    # sum q*max(S-K, 0) sobre K <= S vale S*sum(q) - sum(q*K), e o mesmo vale para as
+    # Puts com K > S. Custo O((pernas + preços) log pernas).
+    def payoff(self, S_T):
+        S_T = np.asarray(S_T, dtype=float)
+        total = np.zeros_like(S_T)
+        for calls in (True, False):
+            mask = self.is_call == calls
+            order = np.argsort(self.strike[mask])
+            strikes = self.strike[mask][order]
+            q = self.quantity[mask][order]
+            cum_q = np.concatenate([[0.0], np.cumsum(q)])
+            cum_qk = np.concatenate([[0.0], np.cumsum(q * strikes)])
+            below = np.searchsorted(strikes, S_T, side="right")
+            if calls:
+                total += S_T * cum_q[below] - cum_qk[below]
+            else:
+                total += (cum_qk[-1] - cum_qk[below]) - S_T * (cum_q[-1] - cum_q[below])
+        return total
+
+    # Lucro/prejuízo no vencimento, descontando o custo de montagem
+    def profit(self, S_T):
+        return self.payoff(S_T) - self.cost()
+
+    # Preço (marcação a modelo) e Gregas líquidas com o ativo em S, `elapsed` anos
+    # depois da montagem. sigma pode ser um escalar, um array por perna ou uma
+    # superfície de volatilidade. Pernas já vencidas valem o payoff e só contribuem
+    # para o Delta.
+    # Com `per_leg=True` devolve também os valores de cada perna (já multiplicados pela quantidade).
+    def price_and_greeks(self, S, r, sigma, elapsed=0.0, per_leg=False):
+        T = self.expiry - elapsed
+        alive = T > 0
+        # Uma superfície de volatilidade é avaliada pelo kernel no strike e no prazo restante de cada perna
+        if not callable(sigma):
+            sigma = np.broadcast_to(np.asarray(sigma, dtype=float), self.quantity.shape)[alive]
+        legs = {name: np.zeros(len(self)) for name in ("price",) + GREEKS}
+        values = price_and_greeks(S, self.strike[alive], T[alive], r, sigma, self.option_types()[alive])
+        for name in legs:
+            legs[name][alive] = values[name]
+
+        expired = ~alive
+        sign = np.where(self.is_call[expired], 1.0, -1.0)
+        legs["price"][expired] = np.maximum(sign * (S - self.strike[expired]), 0.0)
+        legs["delta"][expired] = sign * (sign * (S - self.strike[expired]) > 0)
+
+        legs = {name: self.quantity * value for name, value in legs.items()}
+        result = {name: float(value.sum()) for name, value in legs.items()}
+        if per_leg:
+            result["legs"] = legs
+        return result
+
+
+# Estratégias prontas. `quantity` multiplica todas as pernas (negativa = estratégia vendida).
+def bull_call_spread(K_low, K_high, T, quantity=1.0):
+    return Strategy([quantity, -quantity], [True, True], [K_low, K_high], T)
+
+def bear_put_spread(K_low, K_high, T, quantity=1.0):
+    return Strategy([-quantity, quantity], [False, False], [K_low, K_high], T)
+
+def straddle(K, T, quantity=1.0):
+    return Strategy([quantity, quantity], [True, False], K, T)
+
+def strangle(K_put, K_call, T, quantity=1.0):
+    return Strategy([quantity, quantity], [False, True], [K_put, K_call], T)
+
+def butterfly(K_low, K_mid, K_high, T, option_type="Call", quantity=1.0):
+    return Strategy([quantity, -2 * quantity, quantity], option_type == "Call", [K_low, K_mid, K_high], T)
+
+def iron_condor(K_put_low, K_put_high, K_call_low, K_call_high, T, quantity=1.0):
+    return Strategy([quantity, -quantity, -quantity, quantity], [False, False, True, True],
+                    [K_put_low, K_put_high, K_call_low, K_call_high], T)
+
+
+# Estratégias prontas montadas em torno de um strike central K com distância `width`
+# entre os strikes, no formato usado pela interface
+PRESETS = {
+    "Trava de Alta com Calls": lambda K, width, T: bull_call_spread(K - width, K + width, T),
+    "Trava de Baixa com Puts": lambda K, width, T: bear_put_spread(K - width, K + width, T),
+    "Straddle": lambda K, width, T: straddle(K, T),
+    "Strangle": lambda K, width, T: strangle(K - width, K + width, T),
+    "Borboleta": lambda K, width, T: butterfly(K - width, K, K + width, T),
+    "Condor de Ferro": lambda K, width, T: iron_condor(K - 2 * width, K - width, K + width, K + 2 * width, T),
+}
+
+
+# Livro aleatório com n pernas, para medir a escala do cálculo agregado
+def random_book(n_legs, S=100.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return Strategy(
+        quantity=rng.integers(-10, 11, n_legs),
+        is_call=rng.random(n_legs) < 0.5,
+        strike=S * rng.uniform(0.5, 1.5, n_legs),
+        expiry=rng.uniform(0.02, 2.0, n_legs),
+    )
+
+
+# Tempo do preço/Gregas líquidas e do payoff (1000 pontos) para livros de tamanhos
+# crescentes; o Delta agregado é conferido contra a soma perna a perna
+def measure_throughput(sizes=(10**2, 10**3, 10**4, 10**5), S=100.0, r=0.05, sigma=0.2, seed=0):
+    report = []
+    S_T = np.linspace(0.0, 2 * S, 1000)
+    for n in sizes:
+        book = random_book(n, S, seed)
+
+        start = time.perf_counter()
+        totals = book.price_and_greeks(S, r, sigma)
+        greeks_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        book.payoff(S_T)
+        payoff_elapsed = time.perf_counter() - start
+
+        reference = price_and_greeks(S, book.strike, book.expiry, r, sigma, book.option_types())
+        report.append({
+            "legs": n,
+            "greeks_seconds": greeks_elapsed,
+            "legs_per_second": n / greeks_elapsed,
+            "payoff_seconds": payoff_elapsed,
+            "delta_error": abs(totals["delta"] - float(np.dot(book.quantity, reference["delta"]))),
+        })
+    return report
@@ -0,0 +1,29 @@
+import numpy as np
+
+from .black_scholes import price_and_greeks
+
+# Eixo y suportado -> argumento do kernel que ele substitui
+SURFACE_AXES = ("T", "sigma")
+
+
+# Preço e Gregas sobre uma grade 2-D (y, S), onde y é T ou sigma. A grade é montada
+# por broadcasting (S como linha, y como coluna), então uma única chamada do kernel
+# avalia todos os pontos. Devolve um dicionário de arrays com forma (len(y), len(S)),
+# na precisão `dtype` (float32 ocupa metade da memória).
+def greek_surface(S_range, y_range, axis, K, T, r, sigma, option_type="Call", dtype=None):
+    if axis not in SURFACE_AXES:
+        raise ValueError(f"axis deve ser um de {SURFACE_AXES}")
+    S_grid = np.asarray(S_range)[np.newaxis, :]
+    y_grid = np.asarray(y_range)[:, np.newaxis]
+    if axis == "T":
+        return price_and_greeks(S_grid, K, y_grid, r, sigma, option_type, dtype=dtype)
+    return price_and_greeks(S_grid, K, T, r, y_grid, option_type, dtype=dtype)
+
+
+# Reduz uma superfície para no máximo max_points por eixo, escolhendo linhas e
+# colunas igualmente espaçadas (as extremidades são preservadas), antes de enviá-la
+# ao navegador
+def downsample_surface(x, y, z, max_points):
+    rows = np.unique(np.linspace(0, len(y) - 1, min(len(y), max_points)).round().astype(int))
+    cols = np.unique(np.linspace(0, len(x) - 1, min(len(x), max_points)).round().astype(int))
+    return x[cols], y[rows], z[np.ix_(rows, cols)]
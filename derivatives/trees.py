@@ -0,0 +1,135 @@
+import time
+
+import numpy as np
+
+from .black_scholes import price_and_greeks
+from .cache import lru_ttl_cache
+
+TREE_METHODS = ("crr", "trinomial")
+
+# Contratos por bloco são escolhidos para que cada array da árvore tenha no máximo
+# esta quantidade de elementos (~1.6 MB em float64): os três arrays de trabalho cabem
+# no cache, o que deixa a indução ~1.7x mais rápida que com blocos de 16 MB
+MAX_TREE_ELEMENTS = 200_000
+
+
+# Indução retroativa para um bloco de contratos (arrays com forma (1, m)). Os valores
+# vivem em um único array (largura, m) reaproveitado a cada passo: o passo j escreve
+# nas primeiras linhas a partir das linhas seguintes do passo j+1, sem alocar nada.
+# Com os nós no primeiro eixo, cada fatia do passo é um bloco contíguo de memória.
+# Delta e Gamma saem dos nós dos primeiros passos, sem reprecificar.
+def _induct(S, K, T, r, sigma, sign, n_steps, american, method):
+    dt = T / n_steps
+    disc = np.exp(-r * dt)
+    if method == "crr":
+        u = np.exp(sigma * np.sqrt(dt))
+        p = (np.exp(r * dt) - 1 / u) / (u - 1 / u)
+        probs = (disc * (1 - p), disc * p)  # nó de baixo, nó de cima
+        width = n_steps + 1
+        # Nós do vencimento S*u^(2i - N); em cada passo para trás, S*u^(2i - j) = (nó anterior)*u
+        nodes = S * u ** (2.0 * np.arange(width)[:, np.newaxis] - n_steps)
+    else:
+        # Trinomial de Boyle: u = exp(σ√(2dt)), nós S*u^(i - j) com i = 0..2j
+        u = np.exp(sigma * np.sqrt(2 * dt))
+        a = np.exp(sigma * np.sqrt(dt / 2))
+        growth = np.exp(r * dt / 2)
+        p_up = ((growth - 1 / a) / (a - 1 / a))**2
+        p_down = ((a - growth) / (a - 1 / a))**2
+        probs = (disc * p_down, disc * (1 - p_up - p_down), disc * p_up)
+        width = 2 * n_steps + 1
+        nodes = S * u ** (np.arange(width)[:, np.newaxis] - float(n_steps))
+
+    values = np.maximum(sign * (nodes - K), 0.0)
+    scratch = np.empty_like(values)
+    scratch_up = np.empty_like(values) if method == "trinomial" else None
+    snapshots = {}
+    for j in range(n_steps - 1, -1, -1):
+        n = j + 1 if method == "crr" else 2 * j + 1
+        out, tmp = values[:n], scratch[:n]
+        # Valor esperado descontado; as linhas 1.. são lidas antes de `out` (linhas :n) ser sobrescrito
+        np.multiply(values[1:n + 1], probs[1], out=tmp)
+        if method == "trinomial":
+            np.multiply(values[2:n + 2], probs[2], out=scratch_up[:n])
+            tmp += scratch_up[:n]
+        out *= probs[0]
+        out += tmp
+
+        if method == "crr":
+            nodes[:n] *= u
+            step_nodes = nodes[:n]
+        else:
+            step_nodes = nodes[n_steps - j:n_steps - j + n]
+        if american:
+            np.subtract(step_nodes, K, out=tmp)
+            tmp *= sign
+            np.maximum(out, tmp, out=out)
+        if j in (1, 2):
+            snapshots[j] = (step_nodes.copy(), out.copy())
+
+    price = values[0]
+    # CRR: Delta no passo 1 (2 nós), Gamma no passo 2 (3 nós); trinomial: ambos no passo 1
+    delta_nodes, delta_values = snapshots[1]
+    gamma_nodes, gamma_values = snapshots[2] if method == "crr" else snapshots[1]
+    delta = (delta_values[-1] - delta_values[0]) / (delta_nodes[-1] - delta_nodes[0])
+    slope_up = (gamma_values[2] - gamma_values[1]) / (gamma_nodes[2] - gamma_nodes[1])
+    slope_down = (gamma_values[1] - gamma_values[0]) / (gamma_nodes[1] - gamma_nodes[0])
+    gamma = (slope_up - slope_down) / (0.5 * (gamma_nodes[2] - gamma_nodes[0]))
+    return price, delta, gamma
+
+
+# Preço por árvore (Cox-Ross-Rubinstein ou trinomial) para um ou muitos contratos de
+# uma vez, europeus ou americanos (exercício antecipado checado em cada nó). Os
+# parâmetros aceitam escalares ou arrays com broadcasting, como price_and_greeks, e o
+# resultado traz preço, Delta e Gamma.
+def tree_price(S, K, T, r, sigma, option_type="Call", n_steps=1000, american=False, method="crr"):
+    if method not in TREE_METHODS:
+        raise ValueError(f"method deve ser um de {TREE_METHODS}")
+    if n_steps < 2:
+        raise ValueError("n_steps deve ser pelo menos 2")
+    sign = np.where(np.asarray(option_type) == "Call", 1.0, -1.0)
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)), sign)
+    shape = arrays[0].shape
+    columns = [a.reshape(1, -1) for a in arrays]
+    n_contracts = columns[0].shape[1]
+
+    width = n_steps + 1 if method == "crr" else 2 * n_steps + 1
+    block = max(1, MAX_TREE_ELEMENTS // width)
+    result = {name: np.empty(n_contracts) for name in ("price", "delta", "gamma")}
+    for start in range(0, n_contracts, block):
+        rows = slice(start, start + block)
+        values = _induct(*(c[:, rows] for c in columns), n_steps, american, method)
+        for name, value in zip(("price", "delta", "gamma"), values):
+            result[name][rows] = value
+    return {name: value.reshape(shape)[()] if shape == () else value.reshape(shape) for name, value in result.items()}
+
+
+# Convergência da árvore europeia para a fórmula fechada, com o tempo de cada
+# quantidade de passos, e o prêmio de exercício antecipado da versão americana
+def tree_convergence(S, K, T, r, sigma, option_type="Call", steps=(10, 50, 100, 500, 1000, 5000), method="crr"):
+    reference = float(price_and_greeks(S, K, T, r, sigma, option_type)["price"])
+    report = []
+    for n_steps in steps:
+        start = time.perf_counter()
+        european = tree_price(S, K, T, r, sigma, option_type, n_steps, american=False, method=method)["price"]
+        elapsed = time.perf_counter() - start
+        american = tree_price(S, K, T, r, sigma, option_type, n_steps, american=True, method=method)["price"]
+        report.append({
+            "steps": n_steps,
+            "european": float(european),
+            "american": float(american),
+            "black_scholes": reference,
+            "error": float(european) - reference,
+            "seconds": elapsed,
+        })
+    return report
+
+
+# Escada de passos da página de Black-Scholes: até 1000 passos a tabela inteira custa
+# dezenas de ms; a de 5000 (centenas de ms) fica para benchmarks/trees.py
+PAGE_STEPS = (10, 50, 100, 500, 1000)
+
+
+# tree_convergence compartilhada entre sessões, para quando os mesmos parâmetros voltam
+@lru_ttl_cache(maxsize=128, ttl=3600)
+def tree_convergence_table(S, K, T, r, sigma, option_type="Call", method="crr", steps=PAGE_STEPS):
+    return tree_convergence(S, K, T, r, sigma, option_type, steps, method)
@@ -0,0 +1,180 @@
+import time
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from .cache import lru_ttl_cache
+from .fourier import fft_price
+from .implied_vol import implied_volatility
+
+# Parâmetros da parametrização SVI "raw" de uma fatia (um vencimento), na ordem das
+# colunas de VolSurface.params
+SVI_PARAMS = ("a", "b", "rho", "m", "s")
+
+
+# Variância total w = sigma^2 T da SVI em log-moneyness a termo k = ln(K / F):
+# w(k) = a + b (rho (k - m) + sqrt((k - m)^2 + s^2)). `params` tem as cinco colunas
+# de SVI_PARAMS no último eixo, então cada ponto pode usar a sua própria fatia.
+def svi_total_variance(k, params):
+    a, b, rho, m, s = np.moveaxis(np.asarray(params, dtype=float), -1, 0)
+    x = k - m
+    return a + b * (rho * x + np.sqrt(x * x + s * s))
+
+
+# Derivadas de w(k) em relação a (a, b, rho, m, s), uma coluna por parâmetro
+def _svi_jacobian(k, params):
+    _, b, rho, m, s = params
+    x = k - m
+    root = np.sqrt(x * x + s * s)
+    return np.column_stack([np.ones_like(k), rho * x + root, b * x, -b * (rho + x / root), b * s / root])
+
+
+# Ajuste por mínimos quadrados da SVI a uma fatia, com a Jacobiana analítica. Com
+# a >= 0, b >= 0 e |rho| < 1 a variância total nunca é negativa, em qualquer strike.
+def _fit_slice(k, w):
+    spread = max(np.ptp(k), 1e-3)
+    guess = [0.5 * w.min(), 0.1, 0.0, k[np.argmin(w)], 0.1 * spread]
+    lower = [0.0, 0.0, -0.999, k.min() - spread, 1e-4]
+    upper = [max(w.max(), 1e-8), np.inf, 0.999, k.max() + spread, 10 * spread]
+    fit = least_squares(lambda p: svi_total_variance(k, p) - w, np.clip(guess, lower, upper),
+                        jac=lambda p: _svi_jacobian(k, p), bounds=(lower, upper))
+    return fit.x, float(np.sqrt(np.mean(fit.fun**2)))
+
+
+# Superfície de volatilidade implícita ajustada uma única vez a pontos (K, T, vol):
+# uma SVI por vencimento, guardada como uma linha de `params`. A consulta é
+# vetorizada para arrays de (K, T) com broadcasting: cada ponto acha as fatias
+# vizinhas por busca binária em `expiries` e a variância total é interpolada
+# linearmente em T a log-moneyness a termo fixo. Antes do primeiro e depois do
+# último vencimento vale a vol da fatia mais próxima na mesma log-moneyness.
+#
+# O forward de cada prazo usa o S e o r do ajuste (sticky-strike): a vol depende só
+# de K e T, então a superfície pode ser passada como `sigma` para price_and_greeks e
+# para as funções calculate_*, que a avaliam nos K e T de cada contrato.
+# `rmse` guarda o erro quadrático médio do ajuste de cada fatia, em variância total.
+class VolSurface:
+    def __init__(self, expiries, params, S, r, rmse=None):
+        order = np.argsort(expiries)
+        self.expiries = np.asarray(expiries, dtype=float)[order]
+        self.params = np.asarray(params, dtype=float).reshape(-1, len(SVI_PARAMS))[order]
+        self.S = float(S)
+        self.r = float(r)
+        self.rmse = None if rmse is None else np.asarray(rmse, dtype=float)[order]
+        # Colunas contíguas de cada parâmetro e o inverso do intervalo até o vencimento
+        # anterior (0 na primeira fatia): a consulta só indexa arrays prontos
+        self._columns = tuple(np.ascontiguousarray(column) for column in self.params.T)
+        self._inv_gaps = np.concatenate([[0.0], 1.0 / np.diff(self.expiries)])
+
+    def _total_variance(self, k, slices):
+        a, b, rho, m, s = (column[slices] for column in self._columns)
+        x = k - m
+        return a + b * (rho * x + np.sqrt(x * x + s * s))
+
+    # Ajusta uma SVI por vencimento distinto de T. Cada vencimento precisa de ao
+    # menos cinco strikes (um por parâmetro); pontos com vol NaN (ex.: falhas do
+    # solver de vol implícita) são ignorados.
+    @classmethod
+    def fit(cls, K, T, iv, S, r):
+        K, T, iv = (np.ravel(x) for x in np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (K, T, iv))))
+        ok = np.isfinite(iv) & (T > 0)
+        K, T, iv = K[ok], T[ok], iv[ok]
+        expiries = np.unique(T)
+        params, rmse = [], []
+        for expiry in expiries:
+            mask = T == expiry
+            if mask.sum() < len(SVI_PARAMS):
+                raise ValueError(f"vencimento T={expiry:g} tem menos de {len(SVI_PARAMS)} strikes")
+            k = np.log(K[mask] / S) - r * expiry
+            p, error = _fit_slice(k, iv[mask]**2 * expiry)
+            params.append(p)
+            rmse.append(error)
+        if not params:
+            raise ValueError("nenhum ponto válido para ajustar a superfície")
+        return cls(expiries, params, S, r, rmse)
+
+    # Superfície do sorriso de um modelo de fourier.MODELS (ex.: Heston): as calls de
+    # cada vencimento saem de uma FFT, são invertidas em vol implícita e ajustadas
+    @classmethod
+    def from_model(cls, S, r, model="heston", params=None, expiries=(0.1, 0.25, 0.5, 1.0, 2.0), n_strikes=25):
+        strikes = np.linspace(0.6 * S, 1.4 * S, n_strikes)
+        calls = np.array([fft_price(S, T, r, model, params, strikes)["price"] for T in expiries])
+        K, T = np.meshgrid(strikes, expiries)
+        iv = implied_volatility(calls, S, K, T, r)["iv"]
+        return cls.fit(K, T, iv, S, r)
+
+    # Volatilidade implícita em (K, T); entradas escalares devolvem escalares
+    def __call__(self, K, T):
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        k = np.log(K / self.S) - self.r * T
+        # Fora dos vencimentos ajustados, T_in é o vencimento mais próximo e a
+        # variância total escala com T / T_in (vol constante)
+        T_in = np.clip(T, self.expiries[0], self.expiries[-1])
+        hi = np.searchsorted(self.expiries, T_in)
+        lo = np.maximum(hi - 1, 0)
+        weight = 1.0 - (self.expiries[hi] - T_in) * self._inv_gaps[hi]
+        w_lo = self._total_variance(k, lo)
+        w = (w_lo + weight * (self._total_variance(k, hi) - w_lo)) * (T / T_in)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sigma = np.sqrt(np.maximum(w, 0.0) / T)
+        return sigma[()] if sigma.ndim == 0 else sigma
+
+    # Vol implícita na grade (len(T), len(K)), para gráficos da superfície
+    def grid(self, K, T):
+        return self(np.asarray(K)[np.newaxis, :], np.asarray(T)[:, np.newaxis])
+
+
+# Superfície de um modelo ajustada uma vez por conjunto de parâmetros e compartilhada
+# entre sessões; o mesmo objeto também mantém estáveis as chaves de pricing_grid.
+# `params` é uma tupla de pares (nome, valor) para servir de chave do cache.
+@lru_ttl_cache(maxsize=32, ttl=3600)
+def model_surface(S, r, model="heston", params=(), expiries=(0.1, 0.25, 0.5, 1.0, 2.0), n_strikes=25):
+    return VolSurface.from_model(S, r, model, dict(params), expiries, n_strikes)
+
+
+# Pontos (K, T, vol) sintéticos a partir de uma SVI conhecida por vencimento (skew
+# negativo que se achata com o prazo), com ruído gaussiano opcional na vol
+def synthetic_quotes(S=100.0, r=0.05, expiries=(0.1, 0.25, 0.5, 1.0, 2.0), n_strikes=25, noise=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    expiries = np.asarray(expiries, dtype=float)
+    params = np.column_stack([0.03 * expiries, 0.1 * np.sqrt(expiries), np.full(len(expiries), -0.6),
+                              np.full(len(expiries), 0.02), np.full(len(expiries), 0.15)])
+    K = np.tile(np.linspace(0.6 * S, 1.4 * S, n_strikes), len(expiries))
+    T = np.repeat(expiries, n_strikes)
+    w = svi_total_variance(np.log(K / S) - r * T, np.repeat(params, n_strikes, axis=0))
+    iv = np.sqrt(w / T) + noise * rng.standard_normal(len(K))
+    return K, T, iv, VolSurface(expiries, params, S, r)
+
+
+# Tempo de construção (ajuste de todas as fatias) e vazão da consulta para lotes de
+# (K, T) aleatórios de diferentes tamanhos (menor tempo entre `repeat` consultas),
+# com o erro da vol ajustada contra a SVI que gerou os pontos
+def measure_throughput(sizes=(10, 10**3, 10**5, 10**6), expiries=(0.1, 0.25, 0.5, 1.0, 2.0), n_strikes=25,
+                       noise=0.0, seed=0, repeat=5):
+    S, r = 100.0, 0.05
+    K, T, iv, truth = synthetic_quotes(S, r, expiries, n_strikes, noise, seed)
+    start = time.perf_counter()
+    surface = VolSurface.fit(K, T, iv, S, r)
+    fit_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    report = []
+    for n in sizes:
+        K_query = rng.uniform(0.6 * S, 1.4 * S, n)
+        T_query = rng.uniform(min(expiries), max(expiries), n)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            vols = surface(K_query, T_query)
+            timings.append(time.perf_counter() - start)
+        elapsed = min(timings)
+        report.append({
+            "expiries": len(expiries),
+            "quotes": len(K),
+            "fit_milliseconds": fit_seconds * 1000,
+            "max_fit_rmse": float(surface.rmse.max()),
+            "lookups": n,
+            "lookup_microseconds": elapsed * 1e6,
+            "lookups_per_second": n / elapsed,
+            "max_vol_error": float(np.max(np.abs(vols - truth(K_query, T_query)))),
+        })
+    return report